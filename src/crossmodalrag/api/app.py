@@ -29,14 +29,10 @@ class MissingUIBackend(RuntimeError):
 @contextmanager
 def _conn():
     from crossmodalrag.config import get_db_path
-    from crossmodalrag.db import connect, init_db
+    from crossmodalrag.db import db_session
 
-    conn = connect(get_db_path())
-    try:
-        init_db(conn)
+    with db_session(get_db_path()) as conn:
         yield conn
-    finally:
-        conn.close()
 
 
 def create_app():
@@ -14,6 +14,8 @@ HEADER_RE = re.compile(r"^#{1,6}\s")
 CHUNKER_VERSION = "2"
 
 _SENTENCE_END = ".!?"
+_LAST_SENTENCE_BREAK_RE = re.compile(rf".*[{re.escape(_SENTENCE_END)}]\s", re.DOTALL)
+_LAST_SPACE_RE = re.compile(r".*\s", re.DOTALL)
 
 
 def chunk_text(text: str, max_chars: int = 900, overlap: int = 120) -> list[str]:
@@ -125,15 +127,17 @@ def _split_point(text: str, start: int, hard_end: int) -> int:
     para = text.rfind("\n\n", floor + 1, hard_end)
     if para != -1:
         return para
-    for i in range(hard_end - 1, floor, -1):
-        if text[i].isspace() and text[i - 1] in _SENTENCE_END:
-            return i
+    # The greedy ``.*`` makes each match end at the *last* qualifying position, so
+    # both backwards scans run inside the regex engine instead of a per-char loop.
+    sentence = _LAST_SENTENCE_BREAK_RE.match(text, floor, hard_end)
+    if sentence:
+        return sentence.end() - 1
     newline = text.rfind("\n", floor + 1, hard_end)
     if newline != -1:
         return newline
-    for i in range(hard_end - 1, floor, -1):
-        if text[i].isspace():
-            return i
+    space = _LAST_SPACE_RE.match(text, floor + 1, hard_end)
+    if space:
+        return space.end() - 1
     return hard_end
 
 
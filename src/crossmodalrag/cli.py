@@ -2,10 +2,16 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import sqlite3
 import sys
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from itertools import islice
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from crossmodalrag.config import (
     get_connector_paths,
@@ -17,71 +23,122 @@ from crossmodalrag.config import (
     save_history_enabled,
     usage_tracking_enabled,
 )
-from crossmodalrag.db import connect, init_db
+from crossmodalrag.db import connect, db_session, init_db
+from crossmodalrag.capabilities import MissingModalityBackend
 from crossmodalrag.embed.provider import (
     DEFAULT_EMBED_MODEL,
     MissingEmbeddingBackend,
     get_default_provider,
     require_default_provider,
 )
-from crossmodalrag.embed.provider import get_default_provider
-from crossmodalrag.embed.store import (
-    count_embeddings,
-    count_node_embeddings,
-    embed_pending_chunks,
-    embed_pending_nodes,
-)
-from crossmodalrag.evaluation import load_eval_queries_file, run_eval, upsert_eval_queries
-from crossmodalrag.generate.answer import (
-    format_answer_stream_header,
-    format_generated_answer,
-    format_generated_answer_footer,
-    format_grounded_answer,
-    generated_answer_to_dict,
-    template_answer_to_dict,
-)
-from crossmodalrag.generate.provider import LLMUnavailable, get_default_llm_provider
-from crossmodalrag.generate.synthesize import GeneratedAnswer, synthesize_answer
-from crossmodalrag.generation_eval import run_generation_eval
-from crossmodalrag.capabilities import MissingModalityBackend
-from crossmodalrag.ingest.git import ingest_git
-from crossmodalrag.ingest.image import ingest_images
-from crossmodalrag.ingest.notes import ingest_notes
-from crossmodalrag.ingest.pdf import ingest_pdf
 from crossmodalrag.progress import make_progress
-from crossmodalrag.service import retrieve_for_answer
-from crossmodalrag.retrieve.rerank import MODALITY_SOURCE_TYPES, resolve_source_types
-from crossmodalrag.memory.concepts import build_concepts
-from crossmodalrag.memory.episodes import build_episodes
-from crossmodalrag.memory.extract import extract_pending_sources
-from crossmodalrag.memory.graph import build_graph
 from crossmodalrag.retrieve.hybrid import DEFAULT_PROFILE, PROFILE_WEIGHTS
-from crossmodalrag.sample_data import default_sample_db_path, seed_sample_data
+from crossmodalrag.retrieve.rerank import MODALITY_SOURCE_TYPES, resolve_source_types
+
+if TYPE_CHECKING:
+    from crossmodalrag.generate.synthesize import GeneratedAnswer
+
+# Only what `build_parser`/`main` need is imported above. Command implementations (ingest, eval,
+# generation, memory build, sample seeding, the HTTP/LLM stack) are imported inside the `*_cmd`
+# that uses them, so `mem init-db` or `mem --help` never pays for the whole package graph.
+
+
+def get_default_llm_provider(model: str | None = None):
+    # Module-level (not a per-command import) so tests and callers can patch `cli.get_default_llm_provider`.
+    from crossmodalrag.generate.provider import get_default_llm_provider as _get_default_llm_provider
+
+    return _get_default_llm_provider(model)
+
+
+def default_sample_db_path() -> Path:
+    # Patchable module-level name (see tests/conftest.py), resolved lazily like the commands.
+    from crossmodalrag.sample_data import default_sample_db_path as _default_sample_db_path
+
+    return _default_sample_db_path()
+
 
 def init_db_cmd() -> None:
     db_path = get_db_path()
-    conn = connect(db_path)
-    try:
-        init_db(conn)
-    finally:
-        conn.close()
+    with db_session(db_path):
+        pass
     print(f"Initialized database at {db_path}")
 
 
-def ingest_notes_cmd(vault_paths: list[Path]) -> None:
+def _prefetch_in_order(produce, items: list, workers: int | None = None):
+    """Yield ``(item, produce(item))`` in input order, running up to ``workers`` producers ahead.
+
+    Producers (file reads, ``git`` subprocesses) run on a thread pool; the caller consumes results
+    on its own thread, so every SQLite write still happens on the one connection that owns the
+    transaction. At most ``workers`` results are buffered ahead of the writer.
+    """
+    limit = max(1, min(len(items), workers or os.cpu_count() or 1))
+    if limit == 1:
+        for item in items:
+            yield item, produce(item)
+        return
+    with ThreadPoolExecutor(max_workers=limit) as pool:
+        pending: deque = deque()
+        remaining = iter(items)
+        for item in islice(remaining, limit):
+            pending.append((item, pool.submit(produce, item)))
+        try:
+            while pending:
+                item, future = pending.popleft()
+                result = future.result()
+                for nxt in islice(remaining, 1):
+                    pending.append((nxt, pool.submit(produce, nxt)))
+                yield item, result
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def _split_workers(workers: int | None, item_count: int) -> tuple[int, int]:
+    """Split a ``--workers`` budget into ``(items scanned at once, threads per item)``.
+
+    Each prefetched item may run its own thread pool, so the two multiply; the split keeps their
+    product within the budget (default: CPU count) instead of nesting a full-size pool per item.
+    """
+    budget = max(1, workers or os.cpu_count() or 1)
+    outer = max(1, min(item_count, budget))
+    return outer, max(1, budget // outer)
+
+
+def ingest_notes_cmd(vault_paths: list[Path], workers: int | None = None) -> None:
+    from crossmodalrag.ingest.notes import ingest_notes, load_note_stat_signatures, scan_notes
+
     db_path = get_db_path()
     conn = connect(db_path)
     embedder = get_default_provider()
     try:
         init_db(conn)
         total_inserted = 0
-        for vault_path in vault_paths:
-            inserted = ingest_notes(
-                conn, vault_path=vault_path, embedder=embedder,
-                progress=make_progress(f"notes {vault_path.name}"),
-            )
-            total_inserted += inserted
-            print(f"Ingested notes from {vault_path} into {db_path}. Inserted chunks: {inserted}")
+        # One transaction for every vault: a single commit (one WAL sync) instead of one per vault.
+        # Vault scans (read + fingerprint) run ahead on worker threads while this thread writes.
+        try:
+            # Loaded once, before any write: vaults hold distinct files, so a snapshot taken up front
+            # is never stale for the vault it skips files in.
+            known_stats = load_note_stat_signatures(conn)
+            vault_workers, read_workers = _split_workers(workers, len(vault_paths))
+            # closing(): a failed write cancels the scans still queued now, not whenever GC gets to it.
+            with closing(
+                _prefetch_in_order(
+                    lambda path: scan_notes(path, workers=read_workers, known_stats=known_stats),
+                    vault_paths,
+                    vault_workers,
+                )
+            ) as prefetched:
+                for vault_path, scanned in prefetched:
+                    inserted = ingest_notes(
+                        conn, vault_path=vault_path, embedder=embedder,
+                        progress=make_progress(f"notes {vault_path.name}"), commit=False, scanned=scanned,
+                    )
+                    total_inserted += inserted
+                    print(f"Ingested notes from {vault_path} into {db_path}. Inserted chunks: {inserted}")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
     finally:
         conn.close()
     print(
@@ -90,22 +147,35 @@ def ingest_notes_cmd(vault_paths: list[Path]) -> None:
     )
 
 
-def ingest_git_cmd(repo_paths: list[Path], max_commits: int = 300) -> None:
+def ingest_git_cmd(repo_paths: list[Path], max_commits: int = 300, workers: int | None = None) -> None:
+    from crossmodalrag.ingest.git import ingest_git, scan_git
+
     db_path = get_db_path()
     conn = connect(db_path)
     embedder = get_default_provider()
     try:
         init_db(conn)
         total_inserted = 0
-        for repo_path in repo_paths:
-            inserted = ingest_git(
-                conn, repo_path=repo_path, max_commits=max_commits, embedder=embedder,
-                progress=make_progress(f"git {repo_path.name}"),
-            )
-            total_inserted += inserted
-            print(
-                f"Ingested git history from {repo_path} into {db_path}. Inserted chunks: {inserted}"
-            )
+        # One transaction for every repo; `git log`/`git show` for later repos runs ahead on worker
+        # threads (see ingest_notes_cmd).
+        try:
+            with closing(
+                _prefetch_in_order(lambda path: scan_git(path, max_commits=max_commits), repo_paths, workers)
+            ) as prefetched:
+                for repo_path, commit_rows in prefetched:
+                    inserted = ingest_git(
+                        conn, repo_path=repo_path, max_commits=max_commits, embedder=embedder,
+                        progress=make_progress(f"git {repo_path.name}"), commit=False,
+                        commit_rows=commit_rows,
+                    )
+                    total_inserted += inserted
+                    print(
+                        f"Ingested git history from {repo_path} into {db_path}. Inserted chunks: {inserted}"
+                    )
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
     finally:
         conn.close()
     print(
@@ -115,6 +185,8 @@ def ingest_git_cmd(repo_paths: list[Path], max_commits: int = 300) -> None:
 
 
 def ingest_pdf_cmd(pdf_paths: list[Path]) -> None:
+    from crossmodalrag.ingest.pdf import ingest_pdf
+
     db_path = get_db_path()
     conn = connect(db_path)
     embedder = get_default_provider()
@@ -139,6 +211,8 @@ def ingest_pdf_cmd(pdf_paths: list[Path]) -> None:
 
 
 def ingest_images_cmd(image_paths: list[Path]) -> None:
+    from crossmodalrag.ingest.image import ingest_images
+
     db_path = get_db_path()
     conn = connect(db_path)
     embedder = get_default_provider()
@@ -218,6 +292,18 @@ def _run_ask_turn(
     the turn as context; ``None`` on the template/no-LLM paths (a template
     render is not a synthesized answer and is never carried).
     """
+    from crossmodalrag.generate.answer import (
+        format_answer_stream_header,
+        format_generated_answer,
+        format_generated_answer_footer,
+        format_grounded_answer,
+        generated_answer_to_dict,
+        template_answer_to_dict,
+    )
+    from crossmodalrag.generate.provider import LLMUnavailable
+    from crossmodalrag.generate.synthesize import synthesize_answer
+    from crossmodalrag.service import retrieve_for_answer
+
     db_path = get_db_path()
     ask_start = time.monotonic()
     conn = connect(db_path)
@@ -602,7 +688,12 @@ def eval_cmd(
     modalities: list[str] | None = None,
     as_json: bool = False,
 ) -> None:
-    from crossmodalrag.evaluation import eval_summary_to_dict
+    from crossmodalrag.evaluation import (
+        eval_summary_to_dict,
+        load_eval_queries_file,
+        run_eval,
+        upsert_eval_queries,
+    )
 
     db_path = get_db_path()
     restrict_source_types = resolve_source_types(modalities)
@@ -663,6 +754,13 @@ def eval_cmd(
 
 
 def reindex_embeddings_cmd(batch_size: int = 64, model: str | None = None) -> None:
+    from crossmodalrag.embed.store import (
+        count_embeddings,
+        count_node_embeddings,
+        embed_pending_chunks,
+        embed_pending_nodes,
+    )
+
     db_path = get_db_path()
     try:
         provider = require_default_provider(model)
@@ -699,6 +797,9 @@ def eval_generation_cmd(
     model: str | None = None,
     level: str = "evidence",
 ) -> None:
+    from crossmodalrag.generate.provider import LLMUnavailable
+    from crossmodalrag.generation_eval import run_generation_eval
+
     db_path = get_db_path()
     provider = get_default_llm_provider()
     if provider is None:
@@ -737,6 +838,12 @@ def eval_generation_cmd(
 
 
 def build_memory_cmd(level: str = "all", limit: int | None = None, model: str | None = None) -> None:
+    from crossmodalrag.generate.provider import LLMUnavailable
+    from crossmodalrag.memory.concepts import build_concepts
+    from crossmodalrag.memory.episodes import build_episodes
+    from crossmodalrag.memory.extract import extract_pending_sources
+    from crossmodalrag.memory.graph import build_graph
+
     build_events = level in ("event", "all")
     build_eps = level in ("episode", "all")
     build_concept = level in ("concept", "all")
@@ -1187,6 +1294,8 @@ def seed_sample_cmd(
     force: bool = False,
     db_path: Path | None = None,
 ) -> None:
+    from crossmodalrag.sample_data import seed_sample_data
+
     db_path = (db_path or default_sample_db_path()).expanduser().resolve()
     conn = connect(db_path)
     try:
@@ -1224,6 +1333,10 @@ def sync_cmd(max_commits: int = 300, only: list[str] | None = None, as_json: boo
     changed. PDF/image are skipped (not errored) when their extra is absent. A bad path is recorded
     per-connector and does not abort the rest of the sync.
     """
+    from crossmodalrag.ingest.git import ingest_git
+    from crossmodalrag.ingest.image import ingest_images
+    from crossmodalrag.ingest.notes import ingest_notes
+    from crossmodalrag.ingest.pdf import ingest_pdf
     from crossmodalrag.capabilities import has_ocr, has_pdf
 
     available = {"notes": True, "git": True, "pdf": has_pdf(), "ocr_ok": has_ocr()}
@@ -1463,6 +1576,10 @@ def build_parser() -> argparse.ArgumentParser:
         help="Ingest markdown notes from one or more vault paths (or use OBSIDIAN_VAULT_PATH_* from .env).",
     )
     p_notes.add_argument("vault_paths", nargs="*", type=Path)
+    p_notes.add_argument(
+        "--workers", type=int, default=None,
+        help="Total threads reading notes, split across vaults scanned ahead while writing (default: CPU count).",
+    )
 
     p_git = sub.add_parser(
         "ingest-git",
@@ -1470,6 +1587,10 @@ def build_parser() -> argparse.ArgumentParser:
     )
     p_git.add_argument("repo_paths", nargs="*", type=Path)
     p_git.add_argument("--max-commits", type=int, default=300)
+    p_git.add_argument(
+        "--workers", type=int, default=None,
+        help="Repos read (git log/show) ahead in parallel while writing (default: CPU count).",
+    )
 
     p_pdf = sub.add_parser(
         "ingest-pdf",
@@ -1857,18 +1978,27 @@ _EXPECTED_ERRORS = (
     FileNotFoundError,
     MissingModalityBackend,
     MissingEmbeddingBackend,
-    LLMUnavailable,
     sqlite3.Error,
 )
 
 
+def _is_expected_error(exc: BaseException) -> bool:
+    if isinstance(exc, _EXPECTED_ERRORS):
+        return True
+    # LLMUnavailable lives with the HTTP client; if it was raised, that module is already loaded.
+    provider_mod = sys.modules.get("crossmodalrag.generate.provider")
+    return provider_mod is not None and isinstance(exc, provider_mod.LLMUnavailable)
+
+
 def main() -> None:
     load_dotenv()
     parser = build_parser()
     args = parser.parse_args()
     try:
         _dispatch(parser, args)
-    except _EXPECTED_ERRORS as exc:
+    except Exception as exc:
+        if not _is_expected_error(exc):
+            raise
         print(f"error: {exc}", file=sys.stderr)
         raise SystemExit(1)
 
@@ -1904,7 +2034,7 @@ def _dispatch(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None
                 "or define `OBSIDIAN_VAULT_PATH_1`, `OBSIDIAN_VAULT_PATH_2`, ... in your local .env "
                 "for default ingestion targets."
             )
-        ingest_notes_cmd(vault_paths)
+        ingest_notes_cmd(vault_paths, workers=args.workers)
         return
     if args.command == "ingest-git":
         repo_paths = _resolve_ingest_paths(
@@ -1918,7 +2048,7 @@ def _dispatch(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None
                 "or define `REPO_PATH_1`, `REPO_PATH_2`, ... in your local .env "
                 "for default ingestion targets."
             )
-        ingest_git_cmd(repo_paths, max_commits=args.max_commits)
+        ingest_git_cmd(repo_paths, max_commits=args.max_commits, workers=args.workers)
         return
     if args.command == "ingest-pdf":
         pdf_paths = _resolve_ingest_paths(
@@ -2,29 +2,44 @@ from __future__ import annotations
 
 import os
 import re
+from functools import lru_cache
 from pathlib import Path
 
+# .env files already applied this process, keyed by (resolved path, mtime_ns): values are only
+# ever ``setdefault``-ed, so re-parsing an unchanged file can never change the environment.
+_LOADED_DOTENV: set[tuple[Path, int]] = set()
+
+# One `KEY=value` line: surrounding whitespace trimmed, `#` comment lines and lines without `=`
+# skipped, everything after the first `=` kept verbatim (values may contain `#`, e.g. paths).
+# `[^\S\n]` is whitespace short of a newline, so no match ever spans two lines.
+_DOTENV_LINE_RE = re.compile(
+    r"^[^\S\n]*([^#=\s](?:[^=\n]*[^=\s])?)[^\S\n]*=[^\S\n]*(.*?)[^\S\n]*$", re.MULTILINE
+)
+
 
 def load_dotenv(dotenv_path: Path | None = None) -> None:
     path = dotenv_path or (Path.cwd() / ".env")
-    if not path.exists():
+    try:
+        key = (path.resolve(), path.stat().st_mtime_ns)
+    except OSError:
+        return
+    if key in _LOADED_DOTENV:
         return
-    for raw_line in path.read_text(encoding="utf-8", errors="ignore").splitlines():
-        line = raw_line.strip()
-        if not line or line.startswith("#") or "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        key = key.strip()
-        value = value.strip().strip('"').strip("'")
-        if key:
-            os.environ.setdefault(key, value)
+    _LOADED_DOTENV.add(key)
+    for match in _DOTENV_LINE_RE.finditer(path.read_text(encoding="utf-8", errors="ignore")):
+        os.environ.setdefault(match.group(1), match.group(2).strip('"').strip("'"))
 
 
 def get_db_path() -> Path:
-    raw = os.getenv("CMRAG_DB_PATH")
+    return _resolve_db_path(os.getenv("CMRAG_DB_PATH"), os.getcwd())
+
+
+@lru_cache(maxsize=8)
+def _resolve_db_path(raw: str | None, cwd: str) -> Path:
+    # Keyed on the inputs (not argument-less) so a changed env var or cwd is never served stale.
     if raw:
         return Path(raw).expanduser().resolve()
-    return Path.cwd() / "data" / "memory.db"
+    return Path(cwd) / "data" / "memory.db"
 
 
 def get_llm_provider_name() -> str:
@@ -213,19 +228,22 @@ def get_chat_context_turns() -> int:
         return 8
 
 
+_NUMBERED_RE_CACHE: dict[str, re.Pattern[str]] = {}
+
+
 def get_numbered_env_paths(prefix: str) -> list[Path]:
-    pattern = re.compile(rf"^{re.escape(prefix)}_(\d+)$")
-    indexed: list[tuple[int, Path]] = []
-    for key, raw in os.environ.items():
-        match = pattern.match(key)
-        if not match:
-            continue
-        value = raw.strip()
-        if not value:
-            continue
-        indexed.append((int(match.group(1)), Path(value).expanduser().resolve()))
+    pattern = _NUMBERED_RE_CACHE.get(prefix)
+    if pattern is None:
+        pattern = _NUMBERED_RE_CACHE[prefix] = re.compile(rf"^{re.escape(prefix)}_(\d+)$")
+    # Filter to the numbered keys first, order by index (stable for `_1`/`_01` ties), and only then
+    # build/resolve Paths — one filesystem resolve per configured path, none per environment entry.
+    indexed = [
+        (int(match.group(1)), value)
+        for key, raw in os.environ.items()
+        if (match := pattern.match(key)) and (value := raw.strip())
+    ]
     indexed.sort(key=lambda item: item[0])
-    return [path for _, path in indexed]
+    return [Path(value).expanduser().resolve() for _, value in indexed]
 
 
 # --- Optional TOML config file ------------------------------------------------------------
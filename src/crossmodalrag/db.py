@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import re
 import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 
 DDL = """
-PRAGMA journal_mode=WAL;
-
 CREATE TABLE IF NOT EXISTS sources (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     source_type TEXT NOT NULL,
@@ -15,9 +16,14 @@ CREATE TABLE IF NOT EXISTS sources (
     timestamp TEXT,
     title TEXT,
     metadata_json TEXT,
+    -- Ingest-internal change detection (notes: size/mtime/chunker); never part of exported metadata.
+    stat_signature TEXT,
     UNIQUE(source_type, source_uri, timestamp)
 );
 
+-- Type-independent source_uri lookups/ranges (the unique key above leads with source_type).
+CREATE INDEX IF NOT EXISTS idx_sources_uri ON sources(source_uri);
+
 CREATE TABLE IF NOT EXISTS evidence_chunks (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     source_id INTEGER NOT NULL,
@@ -103,6 +109,10 @@ CREATE TABLE IF NOT EXISTS queries_eval (
     created_at TEXT DEFAULT CURRENT_TIMESTAMP
 );
 
+-- `--query-prefix` filters with `query_text LIKE 'prefix%'`. LIKE is case-insensitive, so only a
+-- NOCASE index lets SQLite turn it into a range scan (the unique BINARY index cannot serve it).
+CREATE INDEX IF NOT EXISTS idx_queries_eval_text_nocase ON queries_eval(query_text COLLATE NOCASE);
+
 -- append-only usage signal (interaction history). Additive and SEPARABLE — it is
 -- never part of any content/derivation fingerprint, so clearing it restores the exact
 -- baseline. Endpoints are polymorphic (target_kind 'chunk' -> evidence_chunks.id,
@@ -223,22 +233,77 @@ CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages(conversation_id
 """
 
 
+# Per-connection tuning, applied on every connect (pragmas other than journal_mode do not
+# persist in the file). NORMAL sync is durable under WAL (only the last commits can be lost on
+# power failure, never corruption) and drops the per-commit fsync; the rest enlarge the page
+# cache (64 MiB), keep temp b-trees in RAM and memory-map reads (256 MiB).
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+
 def connect(db_path: Path) -> sqlite3.Connection:
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(db_path)
+    # Room for every distinct statement a long ingest/eval/chat session cycles through (the default
+    # 128 lets retrieval, ingest and memory-build SQL evict each other and re-prepare).
+    conn = sqlite3.connect(db_path, cached_statements=256)
     conn.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
 
+# Bump whenever DDL or a migration changes: a database stamped with an older version (or none) gets
+# the full DDL replay + migrations on its next `init_db`.
+SCHEMA_VERSION = 4
+
+
 def init_db(conn: sqlite3.Connection) -> None:
+    if _schema_is_current(conn):
+        # Nothing to create; still honor init_db's contract of leaving no transaction open.
+        if conn.in_transaction:
+            conn.commit()
+        return
     conn.executescript(DDL)
     _run_migrations(conn)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
 
 
+@contextmanager
+def db_session(db_path: Path) -> Iterator[sqlite3.Connection]:
+    """An initialized connection to ``db_path``, closed on exit."""
+    conn = connect(db_path)
+    try:
+        init_db(conn)
+        yield conn
+    finally:
+        conn.close()
+
+
+def _schema_is_current(conn: sqlite3.Connection) -> bool:
+    # One pragma + one catalog read instead of replaying ~40 DDL statements. The object check keeps
+    # init_db self-healing: a dropped table/index (even in a stamped DB) still triggers the replay.
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        return False
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    required = _SCHEMA_OBJECTS
+    # Without FTS5 the candidate index can never exist; demanding it would replay the DDL every call.
+    if EVIDENCE_FTS_TABLE in names or _fts5_available(conn):
+        required = required | _FTS_SCHEMA_OBJECTS
+    return required <= names
+
+
 def _run_migrations(conn: sqlite3.Connection) -> None:
     _ensure_column(conn, table_name="sources", column_name="source_fingerprint", column_def="TEXT")
+    _ensure_column(conn, table_name="sources", column_name="stat_signature", column_def="TEXT")
     _ensure_column(conn, table_name="memory_nodes", column_name="centrality", column_def="REAL")
+    _ensure_unique_eval_queries(conn)
+    _ensure_evidence_fts(conn)
 
 
 def _ensure_column(
@@ -252,3 +317,98 @@ def _ensure_column(
     if column_name in existing:
         return
     conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_def}")
+
+
+def _ensure_unique_eval_queries(conn: sqlite3.Connection) -> None:
+    """One eval row per query_text, enforced by a unique index (the upsert's conflict target).
+
+    Databases created before the index may hold duplicate query_text rows; the oldest row is
+    kept (the one the old SELECT-then-UPDATE upsert treated as canonical) before the index is built.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ux_queries_eval_text'"
+    ).fetchone()
+    if exists:
+        return
+    conn.execute(
+        "DELETE FROM queries_eval WHERE id NOT IN (SELECT MIN(id) FROM queries_eval GROUP BY query_text)"
+    )
+    conn.execute("CREATE UNIQUE INDEX ux_queries_eval_text ON queries_eval(query_text)")
+
+
+# Candidate index for lexical retrieval: a contentless FTS5 table kept in sync by triggers. It only
+# narrows *which* chunks get scored — the score itself stays the Python cosine over `tokenize`. For
+# ASCII text, `unicode61` with `_` as a token char yields exactly `tokenize`'s tokens; the `squashed`
+# column indexes the text with underscores removed, covering the squashed `F_1` -> `f1` variants.
+# Non-ASCII text tokenizes differently (`café` is `caf` to us), so such chunks carry a `flag` token
+# and are always returned as candidates.
+EVIDENCE_FTS_TABLE = "evidence_chunks_fts"
+EVIDENCE_FTS_NON_ASCII = "nonascii"
+_FTS_VALUES = (
+    "{row}.chunk_text, replace({row}.chunk_text, '_', ''), "
+    "CASE WHEN {row}.chunk_text GLOB '*[^' || char(1) || '-' || char(127) || ']*' "
+    f"THEN '{EVIDENCE_FTS_NON_ASCII}' ELSE '' END"
+)
+_EVIDENCE_FTS_DDL = f"""
+CREATE VIRTUAL TABLE {EVIDENCE_FTS_TABLE} USING fts5(
+    chunk_text, squashed, flag, content='', tokenize="unicode61 tokenchars '_'"
+);
+CREATE TRIGGER evidence_chunks_fts_ai AFTER INSERT ON evidence_chunks BEGIN
+    INSERT INTO {EVIDENCE_FTS_TABLE}(rowid, chunk_text, squashed, flag)
+    VALUES (new.id, {_FTS_VALUES.format(row="new")});
+END;
+CREATE TRIGGER evidence_chunks_fts_ad AFTER DELETE ON evidence_chunks BEGIN
+    INSERT INTO {EVIDENCE_FTS_TABLE}({EVIDENCE_FTS_TABLE}, rowid, chunk_text, squashed, flag)
+    VALUES ('delete', old.id, {_FTS_VALUES.format(row="old")});
+END;
+CREATE TRIGGER evidence_chunks_fts_au AFTER UPDATE OF chunk_text ON evidence_chunks BEGIN
+    INSERT INTO {EVIDENCE_FTS_TABLE}({EVIDENCE_FTS_TABLE}, rowid, chunk_text, squashed, flag)
+    VALUES ('delete', old.id, {_FTS_VALUES.format(row="old")});
+    INSERT INTO {EVIDENCE_FTS_TABLE}(rowid, chunk_text, squashed, flag)
+    VALUES (new.id, {_FTS_VALUES.format(row="new")});
+END;
+INSERT INTO {EVIDENCE_FTS_TABLE}(rowid, chunk_text, squashed, flag)
+SELECT id, {_FTS_VALUES.format(row="evidence_chunks")} FROM evidence_chunks;
+"""
+
+
+def has_evidence_fts(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (EVIDENCE_FTS_TABLE,)
+    ).fetchone()
+    return row is not None
+
+
+def _fts5_available(conn: sqlite3.Connection) -> bool:
+    return bool(conn.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0])
+
+
+def _ensure_evidence_fts(conn: sqlite3.Connection) -> None:
+    """Create (and backfill from existing chunks) the lexical candidate index, once.
+
+    A SQLite build without FTS5 simply goes without: lexical retrieval falls back to a full scan.
+    """
+    if has_evidence_fts(conn):
+        return
+    # One transaction: a crash can never leave the table without its triggers or backfill.
+    try:
+        conn.executescript(f"BEGIN;{_EVIDENCE_FTS_DDL}COMMIT;")
+    except sqlite3.OperationalError as exc:
+        conn.rollback()
+        if "fts5" not in str(exc):
+            raise
+
+
+# Every named object init_db guarantees: the DDL's tables/indexes plus those built by migrations.
+_SCHEMA_OBJECTS = frozenset(
+    re.findall(r"CREATE (?:UNIQUE )?(?:TABLE|INDEX) IF NOT EXISTS (\w+)", DDL)
+) | frozenset({"ux_queries_eval_text"})
+# ...and, on SQLite builds with FTS5, the lexical candidate index and its sync triggers.
+_FTS_SCHEMA_OBJECTS = frozenset(
+    {
+        EVIDENCE_FTS_TABLE,
+        "evidence_chunks_fts_ai",
+        "evidence_chunks_fts_ad",
+        "evidence_chunks_fts_au",
+    }
+)
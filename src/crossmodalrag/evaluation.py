@@ -2,10 +2,16 @@ from __future__ import annotations
 
 import json
 import sqlite3
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from pathlib import Path
 
-from crossmodalrag.retrieve.hybrid import DEFAULT_PROFILE, retrieve
+from crossmodalrag.retrieve.hybrid import DEFAULT_PROFILE, retrieve_many
+
+try:  # Optional C parser (the `fast` extra); its JSONDecodeError subclasses json's, so handlers match.
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 
 @dataclass(frozen=True)
@@ -114,22 +120,25 @@ def run_eval(
     restrict_source_types: set[str] | None = None,
     now=None,
 ) -> EvalSummary:
-    queries = list_eval_queries(conn, query_prefix=query_prefix)
+    # Retrieval metrics need gold sources; abstain-only (negative) cases
+    # carry no expected URIs and are evaluated by generation eval instead.
+    queries = [q for q in list_eval_queries(conn, query_prefix=query_prefix) if q.expected_source_uris]
+    evidence_hits = (
+        retrieve_many(
+            conn,
+            [q.query_text for q in queries],
+            top_k=top_k,
+            profile=profile,
+            restrict_source_types=restrict_source_types,
+            now=now,
+        )
+        if level == "evidence"
+        else None
+    )
     results: list[EvalQueryResult] = []
-    for query in queries:
-        # Retrieval metrics need gold sources; abstain-only (negative) cases
-        # carry no expected URIs and are evaluated by generation eval instead.
-        if not query.expected_source_uris:
-            continue
-        if level == "evidence":
-            hits = retrieve(
-                conn,
-                query=query.query_text,
-                top_k=top_k,
-                profile=profile,
-                restrict_source_types=restrict_source_types,
-                now=now,
-            )
+    for idx, query in enumerate(queries):
+        if evidence_hits is not None:
+            hits = evidence_hits[idx]
             retrieved_source_uris = _unique_source_uris_in_order([hit.source_uri for hit in hits])
         else:
             # Level-targeted retrieval + drill-down: recover L0 sources via the matched nodes.
@@ -246,21 +255,32 @@ def distilled_compression_ratio(conn: sqlite3.Connection, *, level: str = "conce
     return (core_total / full_total) if full_total else 1.0
 
 
+# Fixed SQL text per shape, so the connection's statement cache (see db.connect) reuses the
+# prepared statement across calls instead of re-preparing an assembled string.
+_LIST_EVAL_QUERIES_SQL = "SELECT id, query_text, expected_source_uris FROM queries_eval ORDER BY id ASC"
+_LIST_EVAL_QUERIES_BY_PREFIX_SQL = """
+    SELECT id, query_text, expected_source_uris
+    FROM queries_eval
+    WHERE query_text LIKE ?
+    ORDER BY id ASC
+"""
+_UPSERT_EVAL_QUERY_SQL = """
+    INSERT INTO queries_eval (query_text, expected_source_uris)
+    VALUES (?, ?)
+    ON CONFLICT(query_text) DO UPDATE SET expected_source_uris = excluded.expected_source_uris
+    WHERE expected_source_uris IS NOT excluded.expected_source_uris
+"""
+
+
 def list_eval_queries(
     conn: sqlite3.Connection,
     *,
     query_prefix: str | None = None,
 ) -> list[EvalQuery]:
-    sql = """
-        SELECT id, query_text, expected_source_uris
-        FROM queries_eval
-    """
-    params: list[object] = []
     if query_prefix:
-        sql += " WHERE query_text LIKE ?"
-        params.append(f"{query_prefix}%")
-    sql += " ORDER BY id ASC"
-    rows = conn.execute(sql, tuple(params)).fetchall()
+        rows = conn.execute(_LIST_EVAL_QUERIES_BY_PREFIX_SQL, (f"{query_prefix}%",)).fetchall()
+    else:
+        rows = conn.execute(_LIST_EVAL_QUERIES_SQL).fetchall()
     return [
         EvalQuery(
             id=int(row["id"]),
@@ -272,11 +292,19 @@ def list_eval_queries(
 
 
 def load_eval_queries_file(path: Path) -> list[EvalQuery]:
-    raw = json.loads(path.read_text(encoding="utf-8"))
+    return list(iter_eval_queries_file(path))
+
+
+def iter_eval_queries_file(path: Path) -> Iterator[EvalQuery]:
+    """Validate and yield eval rows one at a time (no second list of ``EvalQuery`` objects).
+
+    Feed straight into ``upsert_eval_queries`` when the rows are not needed again; a malformed
+    row raises ``ValueError`` when it is reached.
+    """
+    raw = _json_loads(path.read_bytes())
     if not isinstance(raw, list):
         raise ValueError("Evaluation query file must be a JSON list.")
 
-    out: list[EvalQuery] = []
     for idx, item in enumerate(raw, start=1):
         if not isinstance(item, dict):
             raise ValueError(f"Eval row #{idx} must be an object.")
@@ -287,8 +315,7 @@ def load_eval_queries_file(path: Path) -> list[EvalQuery]:
         if not isinstance(expected, list):
             raise ValueError(f"Eval row #{idx} field 'expected_source_uris' must be a list.")
         expected_uris = [str(x).strip() for x in expected if str(x).strip()]
-        out.append(EvalQuery(id=None, query_text=query_text, expected_source_uris=expected_uris))
-    return out
+        yield EvalQuery(id=None, query_text=query_text, expected_source_uris=expected_uris)
 
 
 @dataclass(frozen=True)
@@ -344,42 +371,21 @@ def _uri_issue(uri: str) -> str | None:
     return None
 
 
-def upsert_eval_queries(conn: sqlite3.Connection, queries: list[EvalQuery]) -> int:
-    for q in queries:
-        expected_json = json.dumps(q.expected_source_uris)
-        rows = conn.execute(
-            """
-            SELECT id, expected_source_uris
-            FROM queries_eval
-            WHERE query_text = ?
-            ORDER BY id ASC
-            """,
-            (q.query_text,),
-        ).fetchall()
-        if not rows:
-            conn.execute(
-                """
-                INSERT INTO queries_eval (query_text, expected_source_uris)
-                VALUES (?, ?)
-                """,
-                (q.query_text, expected_json),
-            )
-            continue
+def upsert_eval_queries(conn: sqlite3.Connection, queries: Iterable[EvalQuery], *, commit: bool = True) -> int:
+    # One prepared statement for the whole batch, driven straight off the iterable; the
+    # unique index on query_text is the conflict target, and unchanged rows are left untouched.
+    count = 0
 
-        canonical_id = int(rows[0]["id"])
-        if str(rows[0]["expected_source_uris"] or "") != expected_json:
-            conn.execute(
-                """
-                UPDATE queries_eval
-                SET expected_source_uris = ?
-                WHERE id = ?
-                """,
-                (expected_json, canonical_id),
-            )
-        for dup in rows[1:]:
-            conn.execute("DELETE FROM queries_eval WHERE id = ?", (int(dup["id"]),))
-    conn.commit()
-    return len(queries)
+    def _params() -> Iterator[tuple[str, str]]:
+        nonlocal count
+        for q in queries:
+            count += 1
+            yield q.query_text, json.dumps(q.expected_source_uris)
+
+    conn.executemany(_UPSERT_EVAL_QUERY_SQL, _params())
+    if commit:
+        conn.commit()
+    return count
 
 
 def parse_expected_source_uris(raw: object) -> list[str]:
@@ -393,7 +399,7 @@ def parse_expected_source_uris(raw: object) -> list[str]:
     if not text:
         return []
     try:
-        parsed = json.loads(text)
+        parsed = _json_loads(text)
     except json.JSONDecodeError:
         return [s.strip() for s in text.split(",") if s.strip()]
     if isinstance(parsed, list):
@@ -404,20 +410,13 @@ def parse_expected_source_uris(raw: object) -> list[str]:
 
 
 def _unique_source_uris_in_order(source_uris: list[str]) -> list[str]:
-    seen: set[str] = set()
-    out: list[str] = []
-    for uri in source_uris:
-        if uri in seen:
-            continue
-        seen.add(uri)
-        out.append(uri)
-    return out
+    # dict preserves insertion order: first occurrence wins, in one C-level pass.
+    return list(dict.fromkeys(source_uris))
 
 
 def _first_correct_rank(retrieved_source_uris: list[str], expected: set[str]) -> int | None:
     if not expected:
         return None
-    for idx, uri in enumerate(retrieved_source_uris, start=1):
-        if uri in expected:
-            return idx
-    return None
+    return next(
+        (idx for idx, uri in enumerate(retrieved_source_uris, start=1) if uri in expected), None
+    )
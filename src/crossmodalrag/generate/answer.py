@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import re
+
 from crossmodalrag.generate.synthesize import GeneratedAnswer
 from crossmodalrag.modality import Locator, format_locator, parse_locator
 from crossmodalrag.retrieve.lexical import RetrievalHit
 
+_WS_RE = re.compile(r"\s+")
+
 
 def _locator(hit: RetrievalHit) -> Locator | None:
     return parse_locator(hit.chunk_metadata_json)
@@ -281,7 +285,12 @@ def _ordered_evidence(gen: GeneratedAnswer) -> list[tuple[str, RetrievalHit]]:
 
 
 def _preview(text: str, max_chars: int = 220) -> str:
-    flat = " ".join(text.split())
+    # Flattening a prefix yields a prefix of the flattened text, so when a bounded head already
+    # flattens past ``max_chars`` the rest (e.g. a long patch) is never scanned.
+    head = text[: max_chars * 4]
+    flat = _WS_RE.sub(" ", head).strip()
+    if len(flat) <= max_chars and len(head) < len(text):
+        flat = _WS_RE.sub(" ", text).strip()
     if len(flat) <= max_chars:
         return flat
     return f"{flat[:max_chars].rstrip()}..."
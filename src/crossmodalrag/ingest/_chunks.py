@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import sqlite3
+
+_INSERT_CHUNKS_SQL = "INSERT INTO evidence_chunks (source_id, chunk_index, chunk_text, metadata_json) VALUES "
+_CHUNK_ROW_PLACEHOLDERS = "(?, ?, ?, ?)"
+# Rows per multi-row INSERT; also bounded by the connection's host-parameter limit (4 per row).
+_MAX_ROWS_PER_INSERT = 500
+
+
+def insert_source_chunks(
+    conn: sqlite3.Connection,
+    source_id: int,
+    chunks: list[str],
+    metadata_json: str,
+    *,
+    with_ids: bool = False,
+) -> list[tuple[int, str]]:
+    """Insert a source's chunks (indexed 0..n-1) as multi-row ``INSERT ... VALUES`` statements.
+
+    One statement per (up to) ``_MAX_ROWS_PER_INSERT`` rows instead of one execution per row:
+    fewer Python-to-SQLite calls and statement steps (the FTS triggers still fire once per row
+    either way). The source's previous chunks must already be deleted. With ``with_ids`` the new ``(chunk_id, chunk_text)`` pairs are
+    read back in chunk order (what ``embed_source_chunks`` takes); otherwise nothing is returned.
+    """
+    per_statement = max(1, min(_MAX_ROWS_PER_INSERT, conn.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER) // 4))
+    for start in range(0, len(chunks), per_statement):
+        group = chunks[start : start + per_statement]
+        params: list = []
+        for idx, chunk in enumerate(group, start=start):
+            params += (source_id, idx, chunk, metadata_json)
+        conn.execute(_INSERT_CHUNKS_SQL + ", ".join([_CHUNK_ROW_PLACEHOLDERS] * len(group)), params)
+    if not with_ids:
+        return []
+    rows = conn.execute(
+        "SELECT id, chunk_text FROM evidence_chunks WHERE source_id = ? ORDER BY chunk_index",
+        (source_id,),
+    ).fetchall()
+    return [(int(row[0]), str(row[1])) for row in rows]
+
+
+def delete_sources(
+    conn: sqlite3.Connection, source_type: str, source_uri: str, *, keep_id: int | None = None
+) -> None:
+    """Delete every ``(source_type, source_uri)`` source row except ``keep_id``, with its chunks.
+
+    Two set-based statements regardless of how many duplicates exist; both resolve the rows through
+    the ``UNIQUE(source_type, source_uri, timestamp)`` index.
+    """
+    params = (source_type, source_uri, keep_id)
+    conn.execute(
+        """
+        DELETE FROM evidence_chunks WHERE source_id IN (
+            SELECT id FROM sources WHERE source_type = ? AND source_uri = ? AND id IS NOT ?
+        )
+        """,
+        params,
+    )
+    conn.execute("DELETE FROM sources WHERE source_type = ? AND source_uri = ? AND id IS NOT ?", params)
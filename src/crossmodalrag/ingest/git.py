@@ -3,15 +3,36 @@ from __future__ import annotations
 import hashlib
 import json
 import os
+import secrets
 import sqlite3
 import subprocess
+import tempfile
+from collections.abc import Iterable, Iterator
+from contextlib import nullcontext
 from pathlib import Path
 
 from crossmodalrag.chunking import CHUNKER_VERSION, chunk_diff
 from crossmodalrag.embed.provider import EmbeddingProvider
+from crossmodalrag.ingest._chunks import delete_sources, insert_source_chunks
 from crossmodalrag.ingest._embed import embed_source_chunks, purge_source_embeddings
 
 
+# (sha, committer ISO timestamp, subject, body, author name, author email, patch + stat)
+CommitRow = tuple[str, str, str, str, str, str, str]
+
+_STREAM_READ_BYTES = 1 << 16
+
+
+def scan_git(repo_path: Path, max_commits: int = 300) -> list[CommitRow]:
+    """Read the last ``max_commits`` commits with their patches (the subprocess half of `ingest_git`).
+
+    Touches no database, so callers may run it on a worker thread while another repo is written.
+    """
+    if not (repo_path / ".git").exists():
+        raise FileNotFoundError(f"Not a git repository: {repo_path}")
+    return _load_commit_rows(repo_path, max_commits=max_commits)
+
+
 def ingest_git(
     conn: sqlite3.Connection,
     repo_path: Path,
@@ -20,72 +41,76 @@ def ingest_git(
     target_author_email: str | None = None,
     embedder: EmbeddingProvider | None = None,
     progress=None,
+    commit: bool = True,
+    commit_rows: list[CommitRow] | None = None,
 ) -> int:
-    if not (repo_path / ".git").exists():
+    # ``commit=False``: see ingest_notes — the caller owns the transaction.
+    # ``commit_rows`` is a precomputed `scan_git(repo_path, max_commits)` (see ingest_notes' ``scanned``).
+    if commit_rows is None and not (repo_path / ".git").exists():
         raise FileNotFoundError(f"Not a git repository: {repo_path}")
 
     if target_author_name is None or target_author_email is None:
         target_author_name, target_author_email = _load_target_author()
-    rows = _load_commit_rows(repo_path, max_commits=max_commits)
+    rows: Iterable[CommitRow]
+    if commit_rows is not None:
+        rows, total = commit_rows, len(commit_rows)
+    elif progress is not None:
+        # A progress line needs the commit count up front.
+        rows = _load_commit_rows(repo_path, max_commits=max_commits)
+        total = len(rows)
+    else:
+        # Stream: each commit is written while `git log` is still producing the next ones.
+        rows, total = _iter_commit_rows(repo_path, max_commits=max_commits), 0
     inserted_chunks = 0
-    total = len(rows)
-    for scanned, row in enumerate(rows, start=1):
-        if progress is not None:
-            progress(scanned, total)
-        sha, ts, subject, body, author_name, author_email, patch = row
-        source_uri = f"{repo_path.resolve()}@{sha}"
-        if author_name != target_author_name or author_email != target_author_email:
-            _delete_source_and_chunks(conn, source_uri=source_uri)
-            continue
-        combined = f"commit: {subject}\n\n{body}\n\n{patch}".strip()
-        source_fingerprint = _source_fingerprint(combined)
-        source_id, unchanged = _upsert_git_source(
-            conn=conn,
-            source_uri=source_uri,
-            source_fingerprint=source_fingerprint,
-            timestamp=ts,
-            title=subject[:200],
-            metadata_json=json.dumps(
+    repo_uri = str(repo_path.resolve())
+    # All-or-nothing, as in ingest_notes.
+    with conn if commit else nullcontext():
+        for scanned, row in enumerate(rows, start=1):
+            if progress is not None:
+                progress(scanned, total)
+            sha, ts, subject, body, author_name, author_email, patch = row
+            source_uri = f"{repo_uri}@{sha}"
+            if author_name != target_author_name or author_email != target_author_email:
+                delete_sources(conn, "git_commit", source_uri)
+                continue
+            combined = f"commit: {subject}\n\n{body}\n\n{patch}".strip()
+            source_fingerprint = _source_fingerprint(combined)
+            source_id, unchanged = _upsert_git_source(
+                conn=conn,
+                source_uri=source_uri,
+                source_fingerprint=source_fingerprint,
+                timestamp=ts,
+                title=subject[:200],
+                metadata_json=json.dumps(
+                    {
+                        "repo": repo_uri,
+                        "sha": sha,
+                        "author_name": author_name,
+                        "author_email": author_email,
+                        "fingerprint": source_fingerprint,
+                    }
+                ),
+            )
+            if unchanged:
+                continue
+
+            purge_source_embeddings(conn, source_id)
+            conn.execute("DELETE FROM evidence_chunks WHERE source_id = ?", (source_id,))
+            chunks = chunk_diff(combined, max_chars=1400, overlap=180)
+            chunk_metadata_json = json.dumps(
                 {
-                    "repo": str(repo_path.resolve()),
+                    "modality": "code+text",
+                    "source_type": "git_commit",
                     "sha": sha,
                     "author_name": author_name,
                     "author_email": author_email,
-                    "fingerprint": source_fingerprint,
                 }
-            ),
-        )
-        if unchanged:
-            continue
-
-        purge_source_embeddings(conn, source_id)
-        conn.execute("DELETE FROM evidence_chunks WHERE source_id = ?", (source_id,))
-        new_chunks: list[tuple[int, str]] = []
-        for idx, chunk in enumerate(chunk_diff(combined, max_chars=1400, overlap=180)):
-            cur = conn.execute(
-                """
-                INSERT INTO evidence_chunks (source_id, chunk_index, chunk_text, metadata_json)
-                VALUES (?, ?, ?, ?)
-                """,
-                (
-                    source_id,
-                    idx,
-                    chunk,
-                    json.dumps(
-                        {
-                            "modality": "code+text",
-                            "source_type": "git_commit",
-                            "sha": sha,
-                            "author_name": author_name,
-                            "author_email": author_email,
-                        }
-                    ),
-                ),
             )
-            new_chunks.append((int(cur.lastrowid), chunk))
-            inserted_chunks += 1
-        embed_source_chunks(conn, embedder, new_chunks)
-    conn.commit()
+            new_chunks = insert_source_chunks(
+                conn, source_id, chunks, chunk_metadata_json, with_ids=embedder is not None
+            )
+            inserted_chunks += len(chunks)
+            embed_source_chunks(conn, embedder, new_chunks)
     return inserted_chunks
 
 
@@ -131,10 +156,8 @@ def _upsert_git_source(
     is_legacy_unchanged = existing_fingerprint is None and existing_timestamp == timestamp
     is_unchanged = existing_fingerprint == source_fingerprint or is_legacy_unchanged
 
-    for row in rows[:-1]:
-        old_id = int(row["id"])
-        conn.execute("DELETE FROM evidence_chunks WHERE source_id = ?", (old_id,))
-        conn.execute("DELETE FROM sources WHERE id = ?", (old_id,))
+    if len(rows) > 1:
+        delete_sources(conn, "git_commit", source_uri, keep_id=canonical_id)
 
     if is_unchanged:
         if existing_fingerprint is None:
@@ -159,8 +182,19 @@ def _upsert_git_source(
     return canonical_id, False
 
 
-def _load_commit_rows(repo_path: Path, max_commits: int) -> list[tuple[str, str, str, str, str, str, str]]:
-    fmt = "%H%x1f%cI%x1f%s%x1f%b%x1f%an%x1f%ae%x1e"
+def _load_commit_rows(repo_path: Path, max_commits: int) -> list[CommitRow]:
+    return list(_iter_commit_rows(repo_path, max_commits=max_commits))
+
+
+def _iter_commit_rows(repo_path: Path, max_commits: int) -> Iterator[CommitRow]:
+    # One `git log` carries every commit's metadata *and* its `--patch --stat` text, instead of a
+    # `git show` fork per commit. Records are delimited by per-run nonce markers so no byte sequence
+    # inside a diff can split them. With `tformat:` each record is `header` + "\n", then (for
+    # non-empty commits) "---\n" + exactly what `git show --format= --patch --stat <sha>` prints.
+    # Rows are yielded as records arrive, so the full log is never held in memory at once.
+    nonce = secrets.token_hex(8)
+    record_start, header_end = f"\x1e{nonce}".encode(), f"\x1d{nonce}"
+    fmt = f"%x1e{nonce}%H%x1f%cI%x1f%s%x1f%b%x1f%an%x1f%ae%x1d{nonce}"
     log_cmd = [
         "git",
         "-C",
@@ -168,56 +202,52 @@ def _load_commit_rows(repo_path: Path, max_commits: int) -> list[tuple[str, str,
         "log",
         "--encoding=none",
         f"--max-count={max_commits}",
-        f"--pretty=format:{fmt}",
+        f"--pretty=tformat:{fmt}",
         "--no-merges",
+        "--patch",
+        "--stat",
     ]
-    out = _run_git_text(log_cmd)
-    commits: list[tuple[str, str, str, str, str, str, str]] = []
-    for record in out.split("\x1e"):
-        record = record.strip()
-        if not record:
-            continue
-        parts = record.split("\x1f")
-        if len(parts) < 6:
+    for record in _stream_git_records(log_cmd, record_start):
+        # The marker is ASCII, so decoding per record matches decoding the whole output at once.
+        header, found, patch = record[len(record_start):].decode("utf-8", errors="replace").partition(header_end)
+        parts = header.split("\x1f")
+        if not found or len(parts) < 6:
             continue
-        sha, ts, subject, body, author_name, author_email = (
-            parts[0],
-            parts[1],
-            parts[2],
-            parts[3],
-            parts[4],
-            parts[5],
-        )
-        patch = _commit_patch(repo_path, sha)
-        commits.append((sha, ts, subject, body, author_name, author_email, patch))
-    return commits
-
-
-def _commit_patch(repo_path: Path, sha: str) -> str:
-    cmd = ["git", "-C", str(repo_path), "show", "--format=", "--patch", "--stat", sha]
-    return _run_git_text(cmd)
-
+        sha, ts, subject, body, author_name, author_email = parts[:6]
+        patch = patch.removeprefix("\n").removeprefix("---\n")
+        yield (sha, ts, subject, body, author_name, author_email, patch)
 
-def _run_git_text(cmd: list[str]) -> str:
-    completed = subprocess.run(cmd, check=True, capture_output=True)
-    return completed.stdout.decode("utf-8", errors="replace")
 
+def _stream_git_records(cmd: list[str], marker: bytes) -> Iterator[bytes]:
+    """Yield each ``marker``-prefixed record of ``cmd``'s stdout as soon as it is complete.
 
-def _delete_source_and_chunks(conn: sqlite3.Connection, source_uri: str) -> None:
-    rows = conn.execute(
-        """
-        SELECT id FROM sources
-        WHERE source_type = ? AND source_uri = ?
-        ORDER BY id ASC
-        """,
-        ("git_commit", source_uri),
-    ).fetchall()
-    if not rows:
-        return
-    for row in rows:
-        source_id = int(row["id"])
-        conn.execute("DELETE FROM evidence_chunks WHERE source_id = ?", (source_id,))
-        conn.execute("DELETE FROM sources WHERE id = ?", (source_id,))
+    Raises ``CalledProcessError`` (with stderr) after the last record if the command failed. stderr
+    goes to a temp file rather than a pipe, so a chatty stderr can never stall the stdout reader.
+    """
+    with tempfile.TemporaryFile() as stderr, subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=stderr
+    ) as proc:
+        assert proc.stdout is not None
+        try:
+            buf = bytearray()
+            scan_from = 1
+            while chunk := proc.stdout.read(_STREAM_READ_BYTES):
+                buf += chunk
+                while (cut := buf.find(marker, scan_from)) != -1:
+                    if buf.startswith(marker):
+                        yield bytes(buf[:cut])
+                    del buf[:cut]
+                    scan_from = 1
+                # Resume just before the tail, where a marker may straddle two reads.
+                scan_from = max(1, len(buf) - len(marker) + 1)
+            if buf.startswith(marker):
+                yield bytes(buf)
+        except GeneratorExit:
+            proc.kill()  # the consumer stopped early (after a normal EOF, git may still be exiting)
+            raise
+        if proc.wait() != 0:
+            stderr.seek(0)
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr.read())
 
 
 def _load_target_author() -> tuple[str, str]:
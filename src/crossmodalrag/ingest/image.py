@@ -10,6 +10,7 @@ from pathlib import Path
 from crossmodalrag.capabilities import require_ocr
 from crossmodalrag.chunking import CHUNKER_VERSION, chunk_text
 from crossmodalrag.embed.provider import EmbeddingProvider
+from crossmodalrag.ingest._chunks import delete_sources, insert_source_chunks
 from crossmodalrag.ingest._embed import embed_source_chunks, purge_source_embeddings
 from crossmodalrag.modality import MODALITY_OCR, build_chunk_metadata
 
@@ -22,6 +23,7 @@ def ingest_images(
     image_path: Path,
     embedder: EmbeddingProvider | None = None,
     progress=None,
+    commit: bool = True,
 ) -> int:
     """Ingest one image file or a directory of images into L0 ``evidence_chunks``.
 
@@ -43,7 +45,9 @@ def ingest_images(
         if progress is not None:
             progress(scanned, total)
         inserted_chunks += _ingest_one_image(conn, path, embedder, pytesseract, Image)
-    conn.commit()
+    # ``commit=False``: see ingest_notes — the caller owns the transaction.
+    if commit:
+        conn.commit()
     return inserted_chunks
 
 
@@ -100,30 +104,16 @@ def _ingest_one_image(
     purge_source_embeddings(conn, source_id)
     conn.execute("DELETE FROM evidence_chunks WHERE source_id = ?", (source_id,))
 
-    new_chunks: list[tuple[int, str]] = []
-    for idx, chunk in enumerate(chunk_text(ocr_text)):
-        cur = conn.execute(
-            """
-            INSERT INTO evidence_chunks (source_id, chunk_index, chunk_text, metadata_json)
-            VALUES (?, ?, ?, ?)
-            """,
-            (
-                source_id,
-                idx,
-                chunk,
-                json.dumps(
-                    build_chunk_metadata(
-                        modality=MODALITY_OCR,
-                        source_type=SOURCE_TYPE,
-                        ocr_confidence=confidence,
-                    )
-                ),
-            ),
-        )
-        new_chunks.append((int(cur.lastrowid), chunk))
-
+    chunks = chunk_text(ocr_text)
+    # Every chunk of an image carries the same metadata: encode it once.
+    chunk_metadata_json = json.dumps(
+        build_chunk_metadata(modality=MODALITY_OCR, source_type=SOURCE_TYPE, ocr_confidence=confidence)
+    )
+    new_chunks = insert_source_chunks(
+        conn, source_id, chunks, chunk_metadata_json, with_ids=embedder is not None
+    )
     embed_source_chunks(conn, embedder, new_chunks)
-    return len(new_chunks)
+    return len(chunks)
 
 
 def _run_ocr(pytesseract, Image, file_bytes: bytes) -> tuple[str, float | None]:
@@ -205,10 +195,8 @@ def _upsert_image_source(
     is_unchanged = existing_fingerprint == source_fingerprint
 
     # Collapse any historical duplicates so each image path has a single source row.
-    for row in rows[:-1]:
-        old_id = int(row["id"])
-        conn.execute("DELETE FROM evidence_chunks WHERE source_id = ?", (old_id,))
-        conn.execute("DELETE FROM sources WHERE id = ?", (old_id,))
+    if len(rows) > 1:
+        delete_sources(conn, SOURCE_TYPE, source_uri, keep_id=canonical_id)
 
     if is_unchanged:
         return canonical_id, True
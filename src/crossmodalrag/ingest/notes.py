@@ -2,64 +2,183 @@ from __future__ import annotations
 
 import hashlib
 import json
+import os
 import re
 import sqlite3
+import time
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 
 from crossmodalrag.chunking import CHUNKER_VERSION, chunk_markdown
 from crossmodalrag.embed.provider import EmbeddingProvider
+from crossmodalrag.ingest._chunks import delete_sources, insert_source_chunks
 from crossmodalrag.ingest._embed import embed_source_chunks, purge_source_embeddings
 
+# Identical for every note chunk: serialized once, not per chunk.
+_NOTE_CHUNK_METADATA_JSON = json.dumps({"modality": "text", "source_type": "note"})
+
+# A file modified this recently may be rewritten again within the same (coarse) mtime tick with the
+# same size, so its stat is not recorded as proof of unchanged content (git's "racily clean" rule).
+_RACY_MTIME_NS = 2_000_000_000
+
+# "<bytes>:<mtime_ns>:<chunker version>", kept in `sources.stat_signature`; see `load_note_stat_signatures`.
+StatSignature = str
+
+
+@dataclass(frozen=True)
+class ScannedNote:
+    """One note file read off disk: everything the DB write needs, computed without a connection."""
+
+    path: Path
+    text: str
+    source_uri: str
+    timestamp: str
+    source_fingerprint: str
+    metadata_json: str
+    # None when the mtime is too recent to vouch for the content (see _RACY_MTIME_NS).
+    stat_signature: StatSignature | None
+
+
+def scan_notes(
+    vault_path: Path,
+    workers: int | None = None,
+    known_stats: Mapping[str, StatSignature] | None = None,
+) -> list[ScannedNote]:
+    """Read and fingerprint every `*.md` under a vault (the I/O half of `ingest_notes`).
+
+    Touches no database, so callers may run it on a worker thread while another vault is written.
+    Files are read and hashed on up to ``workers`` threads (file reads and SHA-256 release the
+    GIL); results keep the sorted path order regardless. Notes whose size and mtime still match
+    ``known_stats`` (from `load_note_stat_signatures`) are left out without being read.
+    """
+    if not vault_path.exists():
+        raise FileNotFoundError(f"Vault path does not exist: {vault_path}")
+    entries = sorted(_walk_markdown(vault_path))
+    if len(entries) < 2 or workers == 1:
+        scanned = [_scan_note(path, entry, known_stats) for path, entry in entries]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            scanned = list(pool.map(lambda item: _scan_note(*item, known_stats), entries))
+    return [note for note in scanned if note is not None]
+
+
+def load_note_stat_signatures(conn: sqlite3.Connection) -> dict[str, StatSignature]:
+    """The stat signature recorded for each ingested note, keyed by ``source_uri``."""
+    rows = conn.execute(
+        """
+        SELECT source_uri, stat_signature FROM sources
+        WHERE source_type = 'note' AND stat_signature IS NOT NULL
+        ORDER BY id ASC
+        """
+    ).fetchall()
+    return {str(row[0]): str(row[1]) for row in rows}
+
+
+def _walk_markdown(root: Path) -> Iterator[tuple[Path, os.DirEntry]]:
+    """Every non-directory `*.md` under ``root`` — the files ``root.rglob("*.md")`` would yield.
+
+    ``os.scandir`` hands back each entry's type with the listing and caches its stat, so the walk
+    costs one syscall per directory plus one stat per note (not a per-path ``is_dir``/``stat`` pair).
+    Like ``rglob``, symlinked directories are not descended into.
+    """
+    try:
+        with os.scandir(root) as entries:
+            listing = list(entries)
+    except (PermissionError, NotADirectoryError):
+        return
+    for entry in listing:
+        path = root / entry.name
+        if entry.is_dir(follow_symlinks=False):
+            yield from _walk_markdown(path)
+        elif os.path.normcase(entry.name).endswith(".md") and not entry.is_dir():
+            yield path, entry
+
+
+def _scan_note(
+    path: Path,
+    entry: os.DirEntry | None = None,
+    known_stats: Mapping[str, StatSignature] | None = None,
+) -> ScannedNote | None:
+    # Stat before reading: a write racing the read then shows up as a newer mtime next time.
+    stat = entry.stat() if entry is not None else path.stat()
+    source_uri = str(path.resolve())
+    signature: StatSignature = f"{stat.st_size}:{stat.st_mtime_ns}:{CHUNKER_VERSION}"
+    if known_stats is not None and known_stats.get(source_uri) == signature:
+        return None
+    racy = time.time_ns() - stat.st_mtime_ns < _RACY_MTIME_NS
+    text = _read_note_text(path)
+    source_fingerprint = _source_fingerprint(text)
+    return ScannedNote(
+        path=path,
+        text=text,
+        source_uri=source_uri,
+        # Prefer an explicit, content-declared date (deterministic across machines/checkouts and
+        # useful for time-aware layers like drift); fall back to file mtime when absent.
+        timestamp=_parse_note_date(text) or _iso_mtime(stat.st_mtime),
+        source_fingerprint=source_fingerprint,
+        metadata_json=json.dumps({"bytes": stat.st_size, "fingerprint": source_fingerprint}),
+        stat_signature=None if racy else signature,
+    )
+
+
+def _read_note_text(path: Path) -> str:
+    """``path.read_text(encoding="utf-8", errors="ignore")`` without the TextIOWrapper layer.
+
+    One bulk read and decode, then the same universal-newline translation ``read_text`` applies
+    (CRLF and lone CR become LF), so fingerprints of CRLF notes do not change.
+    """
+    text = path.read_bytes().decode("utf-8", errors="ignore")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
 
 def ingest_notes(
     conn: sqlite3.Connection,
     vault_path: Path,
     embedder: EmbeddingProvider | None = None,
     progress=None,
+    commit: bool = True,
+    scanned: list[ScannedNote] | None = None,
 ) -> int:
-    if not vault_path.exists():
-        raise FileNotFoundError(f"Vault path does not exist: {vault_path}")
+    # ``commit=False`` leaves the writes in the caller's open transaction, so a
+    # multi-vault ingest commits (or rolls back) once instead of once per vault.
+    # ``scanned`` is a precomputed `scan_notes(vault_path)` (e.g. prefetched on a worker thread).
+    if scanned is None:
+        scanned = scan_notes(vault_path, known_stats=load_note_stat_signatures(conn))
     inserted_chunks = 0
-    md_files = sorted(vault_path.rglob("*.md"))
-    total = len(md_files)
-    for scanned, path in enumerate(md_files, start=1):
-        if progress is not None:
-            progress(scanned, total)
-        text = path.read_text(encoding="utf-8", errors="ignore")
-        stat = path.stat()
-        source_uri = str(path.resolve())
-        # Prefer an explicit, content-declared date (deterministic across machines/checkouts and
-        # useful for time-aware layers like drift); fall back to file mtime when absent.
-        timestamp = _parse_note_date(text) or _iso_mtime(stat.st_mtime)
-        source_fingerprint = _source_fingerprint(text)
-        metadata_json = json.dumps({"bytes": stat.st_size, "fingerprint": source_fingerprint})
-        source_id, unchanged = _upsert_note_source(
-            conn=conn,
-            source_uri=source_uri,
-            source_fingerprint=source_fingerprint,
-            timestamp=timestamp,
-            title=path.stem,
-            metadata_json=metadata_json,
-        )
-        if unchanged:
-            continue
-
-        purge_source_embeddings(conn, source_id)
-        conn.execute("DELETE FROM evidence_chunks WHERE source_id = ?", (source_id,))
-        new_chunks: list[tuple[int, str]] = []
-        for idx, chunk in enumerate(chunk_markdown(text, title=path.stem)):
-            cur = conn.execute(
-                """
-                INSERT INTO evidence_chunks (source_id, chunk_index, chunk_text, metadata_json)
-                VALUES (?, ?, ?, ?)
-                """,
-                (source_id, idx, chunk, json.dumps({"modality": "text", "source_type": "note"})),
+    total = len(scanned)
+    # One transaction for the whole call (``commit=False``: the caller's): ``with conn`` commits on
+    # success and rolls back on any failure, so a crash mid-ingest never leaves half a vault behind.
+    with conn if commit else nullcontext():
+        for done, note in enumerate(scanned, start=1):
+            if progress is not None:
+                progress(done, total)
+            path, text = note.path, note.text
+            source_id, unchanged = _upsert_note_source(
+                conn=conn,
+                source_uri=note.source_uri,
+                source_fingerprint=note.source_fingerprint,
+                timestamp=note.timestamp,
+                title=path.stem,
+                metadata_json=note.metadata_json,
+                stat_signature=note.stat_signature,
             )
-            new_chunks.append((int(cur.lastrowid), chunk))
-            inserted_chunks += 1
-        embed_source_chunks(conn, embedder, new_chunks)
-    conn.commit()
+            if unchanged:
+                continue
+
+            purge_source_embeddings(conn, source_id)
+            conn.execute("DELETE FROM evidence_chunks WHERE source_id = ?", (source_id,))
+            chunks = chunk_markdown(text, title=path.stem)
+            new_chunks = insert_source_chunks(
+                conn, source_id, chunks, _NOTE_CHUNK_METADATA_JSON, with_ids=embedder is not None
+            )
+            inserted_chunks += len(chunks)
+            embed_source_chunks(conn, embedder, new_chunks)
     return inserted_chunks
 
 
@@ -133,10 +252,11 @@ def _upsert_note_source(
     timestamp: str,
     title: str,
     metadata_json: str,
+    stat_signature: StatSignature | None = None,
 ) -> tuple[int, bool]:
     rows = conn.execute(
         """
-        SELECT id, source_fingerprint, timestamp FROM sources
+        SELECT id, source_fingerprint, timestamp, stat_signature FROM sources
         WHERE source_type = ? AND source_uri = ?
         ORDER BY id ASC
         """,
@@ -146,10 +266,12 @@ def _upsert_note_source(
     if not rows:
         cur = conn.execute(
             """
-            INSERT INTO sources (source_type, source_uri, source_fingerprint, timestamp, title, metadata_json)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT INTO sources (
+                source_type, source_uri, source_fingerprint, timestamp, title, metadata_json, stat_signature
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
             """,
-            ("note", source_uri, source_fingerprint, timestamp, title, metadata_json),
+            ("note", source_uri, source_fingerprint, timestamp, title, metadata_json, stat_signature),
         )
         return int(cur.lastrowid), False
 
@@ -160,10 +282,8 @@ def _upsert_note_source(
     is_unchanged = existing_fingerprint == source_fingerprint or is_legacy_unchanged
 
     # Collapse historical duplicates so each note path has a single source row.
-    for row in rows[:-1]:
-        old_id = int(row["id"])
-        conn.execute("DELETE FROM evidence_chunks WHERE source_id = ?", (old_id,))
-        conn.execute("DELETE FROM sources WHERE id = ?", (old_id,))
+    if len(rows) > 1:
+        delete_sources(conn, "note", source_uri, keep_id=canonical_id)
 
     if is_unchanged:
         # Backfill fingerprint for legacy rows while preserving recency semantics for unchanged content.
@@ -171,19 +291,24 @@ def _upsert_note_source(
             conn.execute(
                 """
                 UPDATE sources
-                SET source_fingerprint = ?, title = ?, metadata_json = ?
+                SET source_fingerprint = ?, title = ?, metadata_json = ?, stat_signature = ?
                 WHERE id = ?
                 """,
-                (source_fingerprint, title, metadata_json, canonical_id),
+                (source_fingerprint, title, metadata_json, stat_signature, canonical_id),
             )
+        elif rows[-1]["stat_signature"] is None and stat_signature is not None:
+            # Same content, no stat on record yet (first seen racy, or ingested before stats were kept):
+            # record it once so the next scan can skip the file unread. A stat that merely moved (a
+            # touched file) is not rewritten: unchanged content means no row write.
+            conn.execute("UPDATE sources SET stat_signature = ? WHERE id = ?", (stat_signature, canonical_id))
         return canonical_id, True
 
     conn.execute(
         """
         UPDATE sources
-        SET source_fingerprint = ?, timestamp = ?, title = ?, metadata_json = ?
+        SET source_fingerprint = ?, timestamp = ?, title = ?, metadata_json = ?, stat_signature = ?
         WHERE id = ?
         """,
-        (source_fingerprint, timestamp, title, metadata_json, canonical_id),
+        (source_fingerprint, timestamp, title, metadata_json, stat_signature, canonical_id),
     )
     return canonical_id, False
@@ -9,6 +9,7 @@ from pathlib import Path
 from crossmodalrag.capabilities import require_pdf
 from crossmodalrag.chunking import CHUNKER_VERSION, chunk_text
 from crossmodalrag.embed.provider import EmbeddingProvider
+from crossmodalrag.ingest._chunks import delete_sources
 from crossmodalrag.ingest._embed import embed_source_chunks, purge_source_embeddings
 from crossmodalrag.modality import MODALITY_PDF_PAGE, build_chunk_metadata
 
@@ -20,6 +21,7 @@ def ingest_pdf(
     pdf_path: Path,
     embedder: EmbeddingProvider | None = None,
     progress=None,
+    commit: bool = True,
 ) -> int:
     """Ingest one PDF file or a directory of PDFs into L0 ``evidence_chunks``.
 
@@ -39,7 +41,9 @@ def ingest_pdf(
         if progress is not None:
             progress(scanned, total)
         inserted_chunks += _ingest_one_pdf(conn, path, embedder, pypdf)
-    conn.commit()
+    # ``commit=False``: see ingest_notes — the caller owns the transaction.
+    if commit:
+        conn.commit()
     return inserted_chunks
 
 
@@ -97,24 +101,16 @@ def _ingest_one_pdf(
     chunk_index = 0
     for page_number, page in enumerate(reader.pages, start=1):
         page_text = page.extract_text() or ""
+        page_metadata_json = json.dumps(
+            build_chunk_metadata(modality=MODALITY_PDF_PAGE, source_type=SOURCE_TYPE, page=page_number)
+        )
         for chunk in chunk_text(page_text):
             cur = conn.execute(
                 """
                 INSERT INTO evidence_chunks (source_id, chunk_index, chunk_text, metadata_json)
                 VALUES (?, ?, ?, ?)
                 """,
-                (
-                    source_id,
-                    chunk_index,
-                    chunk,
-                    json.dumps(
-                        build_chunk_metadata(
-                            modality=MODALITY_PDF_PAGE,
-                            source_type=SOURCE_TYPE,
-                            page=page_number,
-                        )
-                    ),
-                ),
+                (source_id, chunk_index, chunk, page_metadata_json),
             )
             new_chunks.append((int(cur.lastrowid), chunk))
             chunk_index += 1
@@ -204,10 +200,8 @@ def _upsert_pdf_source(
     is_unchanged = existing_fingerprint == source_fingerprint
 
     # Collapse any historical duplicates so each PDF path has a single source row.
-    for row in rows[:-1]:
-        old_id = int(row["id"])
-        conn.execute("DELETE FROM evidence_chunks WHERE source_id = ?", (old_id,))
-        conn.execute("DELETE FROM sources WHERE id = ?", (old_id,))
+    if len(rows) > 1:
+        delete_sources(conn, SOURCE_TYPE, source_uri, keep_id=canonical_id)
 
     if is_unchanged:
         return canonical_id, True
@@ -13,6 +13,7 @@ from __future__ import annotations
 
 import hashlib
 import json
+import re
 import sqlite3
 from dataclasses import dataclass
 from datetime import datetime
@@ -23,6 +24,7 @@ from crossmodalrag.memory.store import resolve_to_evidence
 
 RECALL_PROMPT_VERSION = "recall-v1"
 MAX_EVIDENCE_CHARS = 4000
+_WS_RE = re.compile(r"\s+")
 
 RECALL_SYSTEM_PROMPT = (
     "You write ONE active-recall study question from a memory and its supporting evidence.\n"
@@ -221,5 +223,9 @@ def _upsert_card(
 
 
 def _preview(text: str, max_chars: int = 220) -> str:
-    flat = " ".join(text.split())
+    # Only a bounded head is flattened when it already runs past ``max_chars`` (see answer._preview).
+    head = text[: max_chars * 4]
+    flat = _WS_RE.sub(" ", head).strip()
+    if len(flat) <= max_chars and len(head) < len(text):
+        flat = _WS_RE.sub(" ", text).strip()
     return flat if len(flat) <= max_chars else f"{flat[:max_chars].rstrip()}…"
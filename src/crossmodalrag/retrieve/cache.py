@@ -0,0 +1,104 @@
+"""In-process cache of retrieval results, keyed on the database's committed on-disk state.
+
+Repeated identical queries (the local API, `mem chat`, re-asking in one process) otherwise re-run the
+full corpus scan. Entries are keyed on the DB file *and* its WAL sidecar (size + mtime): under WAL a
+commit lands in ``-wal`` and only reaches the main file at checkpoint, so the main file alone would
+miss writes. Size and mtime alone can also miss one: after a checkpoint the WAL is rewritten from its
+first frame (possibly to the same size, within one coarse mtime tick), so the key also carries the WAL
+header's salts — which SQLite changes on every such restart — and the connection's ``data_version``
+(bumped when another connection commits). A connection with an open transaction, or an in-memory DB, bypasses the cache — its
+uncommitted view is not visible on disk. Entries also expire after a few minutes so recency scoring
+never drifts far from "now".
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+_MAX_ENTRIES = 256
+_TTL_SECONDS = 300.0
+
+# Env knobs read at scoring time; a change must not serve results ranked under the old value.
+_CONFIG_ENV_KEYS = (
+    "CMRAG_DEDUPE_THRESHOLD",
+    "CMRAG_EMBED_MODEL",
+    "CMRAG_MAX_CHUNKS_PER_SOURCE",
+    "CMRAG_TITLE_BOOST_WEIGHT",
+    "CMRAG_USAGE_HALFLIFE_DAYS",
+    "CMRAG_USAGE_SATURATION",
+)
+
+_entries: OrderedDict[tuple, tuple[float, object]] = OrderedDict()
+_lock = threading.Lock()
+
+
+def db_state_token(conn: sqlite3.Connection) -> tuple | None:
+    """A token that changes whenever a commit reaches the DB's files, or None when uncacheable."""
+    if conn.in_transaction:
+        return None
+    row = conn.execute("PRAGMA database_list").fetchone()
+    path = row[2] if row is not None else ""
+    if not path:
+        return None
+    token: list = [path, conn.execute("PRAGMA data_version").fetchone()[0]]
+    for candidate in (path, f"{path}-wal"):
+        try:
+            stat = os.stat(candidate)
+        except OSError:
+            token.append(None)
+            continue
+        token.append((stat.st_size, stat.st_mtime_ns))
+    token.append(_wal_salts(f"{path}-wal"))
+    return tuple(token)
+
+
+def _wal_salts(wal_path: str) -> bytes | None:
+    # WAL header bytes 16..24: the two salts, re-randomized each time the log restarts from frame 0.
+    try:
+        with open(wal_path, "rb") as handle:
+            header = handle.read(24)
+    except OSError:
+        return None
+    return header[16:24] if len(header) == 24 else None
+
+
+def cached_retrieval(conn: sqlite3.Connection, key: tuple, compute: Callable[[], T]) -> T:
+    """Return ``compute()``, memoized under ``key`` for the connection's current DB state.
+
+    The value must be a tuple of lists (e.g. ``(hits, matched_nodes)``). Callers get fresh shallow
+    copies of every element, so mutating a returned hit never leaks into the cache.
+    """
+    state = db_state_token(conn)
+    if state is None:
+        return compute()
+    full_key = (state, tuple(os.environ.get(name) for name in _CONFIG_ENV_KEYS), key)
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(full_key)
+        if entry is not None and now - entry[0] < _TTL_SECONDS:
+            _entries.move_to_end(full_key)
+            return _copy(entry[1])
+    value = compute()
+    with _lock:
+        _entries[full_key] = (now, value)
+        _entries.move_to_end(full_key)
+        while len(_entries) > _MAX_ENTRIES:
+            _entries.popitem(last=False)
+    return _copy(value)
+
+
+def clear_retrieval_cache() -> None:
+    with _lock:
+        _entries.clear()
+
+
+def _copy(value):
+    return tuple([copy.copy(item) for item in items] for items in value)
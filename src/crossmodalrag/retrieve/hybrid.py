@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import sqlite3
+from collections import Counter
 from datetime import datetime, timezone
 
 from crossmodalrag.embed.provider import EmbeddingProvider, get_default_provider
@@ -106,7 +107,8 @@ def retrieve(
     from crossmodalrag.config import get_title_boost_weight
 
     w_title = get_title_boost_weight()
-    title_tokens_cache: dict[str, list[str]] = {}
+    title_stats_cache: dict[str, tuple[Counter[str], float]] = {}
+    recency_cache: dict[str, float] = {}
 
     # Usage (rehearsal strength) is loaded only when the profile asks for it (opt-in).
     usage_strengths: dict[int, float] = {}
@@ -155,7 +157,7 @@ def retrieve(
             continue
 
         vec_norm = ((cosine + 1.0) / 2.0) if cosine is not None else 0.0
-        recency = lexical.recency_score(row["source_timestamp"], now=now)
+        recency = lexical.recency_score(row["source_timestamp"], now=now, cache=recency_cache)
         # Usage only re-ranks candidates that already have semantic/lexical signal (the
         # `continue` guard above) — it can never surface an irrelevant item, which also
         # bounds the retrieve->boost->retrieve feedback loop.
@@ -167,7 +169,7 @@ def retrieve(
             usage_norm = normalize_strength(
                 usage_strengths.get(chunk_id, 0.0), saturation=get_usage_saturation()
             )
-        title_lex = lexical.title_overlap(query_tokens, row["title"], title_tokens_cache)
+        title_lex = lexical.title_overlap(query_tokens, row["title"], title_stats_cache)
         score = (
             (w_vec * vec_norm)
             + (w_lex * lex)
@@ -206,3 +208,52 @@ def retrieve(
     # max_kept bounds dedupe to O(top_k * n): the candidate pool here is every chunk
     # with any signal, and unbounded pairwise dedupe over it dominated ask latency.
     return dedupe_hits(hits, max_kept=top_k)
+
+
+def retrieve_many(
+    conn: sqlite3.Connection,
+    queries: list[str],
+    top_k: int = 5,
+    profile: str = DEFAULT_PROFILE,
+    provider: EmbeddingProvider | None = None,
+    restrict_source_types: set[str] | None = None,
+    now: datetime | None = None,
+) -> list[list[RetrievalHit]]:
+    """``retrieve`` for a batch of queries (result ``i`` answers ``queries[i]``).
+
+    Without a semantic signal, plain (non-comparative) queries share a single
+    lexical corpus scan via ``lexical.retrieve_many``; everything else — the
+    vector path and comparative decomposition — goes through ``retrieve`` per query.
+    """
+    if profile not in PROFILE_WEIGHTS:
+        raise ValueError(
+            f"Unknown profile '{profile}'. Choose from: {', '.join(sorted(PROFILE_WEIGHTS))}."
+        )
+    from crossmodalrag.retrieve.decompose import split_comparative_query
+
+    provider = provider or get_default_provider()
+    results: list[list[RetrievalHit] | None] = [None] * len(queries)
+    if provider is None or not has_vectors_for_model(conn, provider.name):
+        plain = [i for i, query in enumerate(queries) if split_comparative_query(query) is None]
+        batched = lexical.retrieve_many(
+            conn,
+            [queries[i] for i in plain],
+            top_k=top_k,
+            restrict_source_types=restrict_source_types,
+        )
+        for i, hits in zip(plain, batched):
+            results[i] = hits
+    return [
+        hits
+        if hits is not None
+        else retrieve(
+            conn,
+            query=query,
+            top_k=top_k,
+            profile=profile,
+            provider=provider,
+            restrict_source_types=restrict_source_types,
+            now=now,
+        )
+        for query, hits in zip(queries, results)
+    ]
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import json
 import math
 import re
 import sqlite3
 from collections import Counter
+from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from operator import itemgetter, mul
 
+from crossmodalrag.db import EVIDENCE_FTS_NON_ASCII, EVIDENCE_FTS_TABLE, has_evidence_fts
 
 WORD_RE = re.compile(r"[a-zA-Z0-9_]+")
+_LOWER_WORD_RE = re.compile(r"[a-z0-9_]+")
 
 
 @dataclass
@@ -40,12 +45,33 @@ def retrieve(
     restrict_chunk_ids: set[int] | None = None,
     restrict_source_types: set[str] | None = None,
 ) -> list[RetrievalHit]:
-    query_tokens = tokenize(query)
-    if not query_tokens:
-        return []
+    return retrieve_many(
+        conn,
+        [query],
+        top_k=top_k,
+        restrict_chunk_ids=restrict_chunk_ids,
+        restrict_source_types=restrict_source_types,
+    )[0]
 
-    rows = conn.execute(
-        """
+
+def retrieve_many(
+    conn: sqlite3.Connection,
+    queries: list[str],
+    top_k: int = 5,
+    restrict_chunk_ids: set[int] | None = None,
+    restrict_source_types: set[str] | None = None,
+) -> list[list[RetrievalHit]]:
+    """``retrieve`` for a batch of queries over one shared corpus scan.
+
+    Result ``i`` is exactly ``retrieve(conn, queries[i], ...)``; the chunk table is
+    fetched and every chunk tokenized once per batch instead of once per query
+    (the eval loop's dominant cost).
+    """
+    token_lists = [tokenize(query) for query in queries]
+    if not any(token_lists):
+        return [[] for _ in queries]
+
+    sql = """
         SELECT
             c.id as chunk_id,
             c.source_id as source_id,
@@ -59,69 +85,130 @@ def retrieve(
         FROM evidence_chunks c
         JOIN sources s ON s.id = c.source_id
         """
-    ).fetchall()
+    # Every filter runs in SQLite, so excluded chunks are never fetched or tokenized.
+    where: list[str] = []
+    params: list = []
+    if has_evidence_fts(conn):
+        # Only chunks sharing a token with some query can score (lex > 0 below); the FTS index
+        # finds them without reading/tokenizing the rest of the corpus (see db.EVIDENCE_FTS_TABLE).
+        where.append(f"c.id IN (SELECT rowid FROM {EVIDENCE_FTS_TABLE} WHERE {EVIDENCE_FTS_TABLE} MATCH ?)")
+        params.append(_fts_candidate_query(token_lists))
+    if restrict_chunk_ids is not None:
+        # One JSON parameter instead of one placeholder per id (no SQLITE_MAX_VARIABLE_NUMBER limit).
+        where.append("c.id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(sorted(restrict_chunk_ids)))
+    if restrict_source_types is not None:
+        where.append(f"s.source_type IN ({', '.join('?' for _ in restrict_source_types)})")
+        params.extend(sorted(restrict_source_types))
+    if where:
+        sql += "WHERE " + " AND ".join(where)
+    # Each candidate's token counts and norm are computed once per batch, not once per query.
+    # Rows stream off the cursor; only the candidate list is materialized. A chunk sharing no
+    # token with any query scores lex 0 everywhere, so it is dropped before counting (C-level
+    # isdisjoint stops at the first shared token).
+    vocabulary = frozenset(token for tokens in token_lists for token in tokens)
+    candidates = [
+        (row, *_doc_stats(tokens))
+        for row in conn.execute(sql, params)
+        if not vocabulary.isdisjoint(tokens := tokenize(str(row["chunk_text"])))
+    ]
 
     from crossmodalrag.config import get_title_boost_weight
 
     w_title = get_title_boost_weight()
-    title_tokens_cache: dict[str, list[str]] = {}
-
+    title_stats_cache: dict[str, tuple[Counter[str], float]] = {}
+    recency_cache: dict[str, float] = {}
     now = datetime.now(timezone.utc)
-    scored: list[RetrievalHit] = []
-    for row in rows:
-        if restrict_chunk_ids is not None and int(row["chunk_id"]) not in restrict_chunk_ids:
-            continue
-        if restrict_source_types is not None and str(row["source_type"]) not in restrict_source_types:
-            continue
-        tokens = tokenize(str(row["chunk_text"]))
-        lex = lexical_overlap_score(query_tokens, tokens)
+    return [
+        _rank(candidates, query_tokens, top_k, w_title, title_stats_cache, now, recency_cache, restrict_chunk_ids)
+        if query_tokens
+        else []
+        for query_tokens in token_lists
+    ]
+
+
+def _fts_candidate_query(token_lists: list[list[str]]) -> str:
+    # Tokens are [a-z0-9_]+ so quoting is always safe; quoted, `or`/`not` stay plain terms.
+    terms = " OR ".join(f'"{token}"' for token in sorted({t for tokens in token_lists for t in tokens}))
+    return f'{{chunk_text squashed}} : ({terms}) OR flag : "{EVIDENCE_FTS_NON_ASCII}"'
+
+
+def _rank(
+    candidates: list[tuple[sqlite3.Row, Counter[str], float]],
+    query_tokens: list[str],
+    top_k: int,
+    w_title: float,
+    title_stats_cache: dict[str, tuple[Counter[str], float]],
+    now: datetime,
+    recency_cache: dict[str, float],
+    restrict_chunk_ids: set[int] | None,
+) -> list[RetrievalHit]:
+    # Rank plain tuples; a RetrievalHit is only built for candidates the per-source cap and
+    # dedupe actually pull, and dedupe stops once ``top_k`` survive.
+    # The query side of every cosine is fixed for the whole pass: count and norm it once.
+    q_items, q_norm = _query_stats(query_tokens)
+    scored: list[tuple[float, float, float, float, sqlite3.Row]] = []
+    for row, doc_counts, doc_norm in candidates:
+        lex = _cosine(q_items, q_norm, doc_counts, doc_norm)
         if lex <= 0:
             continue
 
-        recency = recency_score(row["source_timestamp"], now=now)
-        title_lex = title_overlap(query_tokens, row["title"], title_tokens_cache)
+        recency = recency_score(row["source_timestamp"], now=now, cache=recency_cache)
+        title_lex = _title_cosine(q_items, q_norm, row["title"], title_stats_cache)
         score = (0.85 * lex) + (0.15 * recency) + (w_title * title_lex)
-        scored.append(
-            RetrievalHit(
-                chunk_id=int(row["chunk_id"]),
-                source_id=int(row["source_id"]),
-                source_type=str(row["source_type"]),
-                source_uri=str(row["source_uri"]),
-                source_timestamp=row["source_timestamp"],
-                title=row["title"],
-                chunk_index=int(row["chunk_index"]),
-                chunk_text=str(row["chunk_text"]),
-                score=score,
-                lexical_score=lex,
-                recency_score=recency,
-                chunk_metadata_json=row["chunk_metadata_json"],
-                title_score=title_lex,
-            )
-        )
-
-    scored.sort(key=lambda hit: hit.score, reverse=True)
+        scored.append((score, lex, recency, title_lex, row))
+
+    scored.sort(key=itemgetter(0), reverse=True)
     # Local import avoids a circular import (rerank imports from this module).
-    from crossmodalrag.retrieve.rerank import cap_hits_per_source, dedupe_hits
+    from crossmodalrag.retrieve.rerank import dedupe_hits, iter_capped_hits
 
+    hits: Iterable[RetrievalHit] = (_make_hit(*entry) for entry in scored)
     # Source-diversity cap applies only to open retrieval (see hybrid.retrieve).
     if restrict_chunk_ids is None:
-        scored = cap_hits_per_source(scored)
+        hits = iter_capped_hits(hits)
     # max_kept bounds dedupe to O(top_k * n) over the full scored pool (see hybrid.retrieve).
-    return dedupe_hits(scored, max_kept=top_k)
+    return dedupe_hits(hits, max_kept=top_k)
+
+
+def _make_hit(score: float, lex: float, recency: float, title_lex: float, row: sqlite3.Row) -> RetrievalHit:
+    return RetrievalHit(
+        chunk_id=int(row["chunk_id"]),
+        source_id=int(row["source_id"]),
+        source_type=str(row["source_type"]),
+        source_uri=str(row["source_uri"]),
+        source_timestamp=row["source_timestamp"],
+        title=row["title"],
+        chunk_index=int(row["chunk_index"]),
+        chunk_text=str(row["chunk_text"]),
+        score=score,
+        lexical_score=lex,
+        recency_score=recency,
+        chunk_metadata_json=row["chunk_metadata_json"],
+        title_score=title_lex,
+    )
 
 
 def title_overlap(
-    query_tokens: list[str], title: object, cache: dict[str, list[str]]
+    query_tokens: list[str], title: object, cache: dict[str, tuple[Counter[str], float]]
+) -> float:
+    """Query overlap with the source title (stats cached per title — titles repeat per source)."""
+    return _title_cosine(*_query_stats(query_tokens), title, cache)
+
+
+def _title_cosine(
+    q_items: list[tuple[str, int]],
+    q_norm: float,
+    title: object,
+    cache: dict[str, tuple[Counter[str], float]],
 ) -> float:
-    """Query overlap with the source title (cached per title — titles repeat per source)."""
     if not title:
         return 0.0
     key = str(title)
-    tokens = cache.get(key)
-    if tokens is None:
-        tokens = tokenize(key)
-        cache[key] = tokens
-    return lexical_overlap_score(query_tokens, tokens)
+    stats = cache.get(key)
+    if stats is None:
+        stats = _doc_stats(tokenize(key))
+        cache[key] = stats
+    return _cosine(q_items, q_norm, *stats)
 
 
 def tokenize(text: str) -> list[str]:
@@ -131,9 +218,13 @@ def tokenize(text: str) -> list[str]:
     query/document boundary (a note's ``F_1`` vs a query's ``f1``) — both sides
     tokenize identically, so matching stays symmetric.
     """
+    # Lowering first lets one C-level findall return the tokens directly. Only safe for ASCII
+    # text: some non-ASCII letters lowercase *to* ASCII (e.g. the Kelvin sign to "k").
+    words = _LOWER_WORD_RE.findall(text.lower()) if text.isascii() else [w.lower() for w in WORD_RE.findall(text)]
+    if "_" not in text:
+        return words
     tokens: list[str] = []
-    for m in WORD_RE.finditer(text):
-        tok = m.group(0).lower()
+    for tok in words:
         tokens.append(tok)
         if "_" in tok:
             squashed = tok.replace("_", "")
@@ -145,20 +236,57 @@ def tokenize(text: str) -> list[str]:
 def lexical_overlap_score(query_tokens: list[str], doc_tokens: list[str]) -> float:
     if not query_tokens or not doc_tokens:
         return 0.0
+    # Most documents share nothing with the query: answer those before counting the doc.
+    if set(query_tokens).isdisjoint(doc_tokens):
+        return 0.0
+    return _cosine(*_query_stats(query_tokens), *_doc_stats(doc_tokens))
 
+
+def _query_stats(query_tokens: list[str]) -> tuple[list[tuple[str, int]], float]:
+    """A query's ``(token, count)`` items and their L2 norm, reused against every document."""
     q = Counter(query_tokens)
+    return list(q.items()), math.sqrt(sum(v * v for v in q.values()))
+
+
+def _doc_stats(doc_tokens: list[str]) -> tuple[Counter[str], float]:
+    """A document's token counts and their L2 norm — the query-independent half of the cosine."""
     d = Counter(doc_tokens)
-    dot = sum(q[t] * d[t] for t in q)
-    q_norm = math.sqrt(sum(v * v for v in q.values()))
-    d_norm = math.sqrt(sum(v * v for v in d.values()))
+    counts = d.values()
+    return d, math.sqrt(sum(map(mul, counts, counts)))
+
+
+def _cosine(q_items: list[tuple[str, int]], q_norm: float, d: Counter[str], d_norm: float) -> float:
+    # Walk the (small) query side and probe the doc with dict.get: a Counter's d[t] misses go
+    # through the Python-level __missing__, and most query terms miss most documents.
+    dot = 0
+    for t, qv in q_items:
+        dv = d.get(t)
+        if dv:
+            dot += qv * dv
     if q_norm == 0 or d_norm == 0:
         return 0.0
     return dot / (q_norm * d_norm)
 
 
-def recency_score(timestamp: str | None, now: datetime) -> float:
+def recency_score(timestamp: str | None, now: datetime, cache: dict[str, float] | None = None) -> float:
+    """``exp(-days_old / 45)`` for a source timestamp (0.0 when missing or unparseable).
+
+    With ``cache`` the score is memoized per timestamp string: every chunk of a source shares its
+    timestamp, so a ranking pass parses each distinct one once. The cache is only valid for one
+    ``now``.
+    """
     if not timestamp:
         return 0.0
+    if cache is None:
+        return _recency_score(timestamp, now)
+    score = cache.get(timestamp)
+    if score is None:
+        score = _recency_score(timestamp, now)
+        cache[timestamp] = score
+    return score
+
+
+def _recency_score(timestamp: str, now: datetime) -> float:
     try:
         dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
         if not dt.tzinfo:
@@ -167,4 +295,3 @@ def recency_score(timestamp: str | None, now: datetime) -> float:
         return math.exp(-days_old / 45.0)
     except ValueError:
         return 0.0
-
@@ -12,6 +12,7 @@ populated field), not the heterogeneous chunk ``modality`` string (notes write
 from __future__ import annotations
 
 import os
+from collections.abc import Iterable, Iterator
 
 from crossmodalrag.retrieve.lexical import (
     RetrievalHit,
@@ -77,19 +78,27 @@ def cap_hits_per_source(hits: list[RetrievalHit], cap: int | None = None) -> lis
         cap = get_max_chunks_per_source()
     if cap <= 0:
         return hits
+    return list(iter_capped_hits(hits, cap=cap))
+
+
+def iter_capped_hits(hits: Iterable[RetrievalHit], cap: int | None = None) -> Iterator[RetrievalHit]:
+    """Lazy `cap_hits_per_source`: a consumer that stops early never pulls the rest of ``hits``."""
+    if cap is None:
+        cap = get_max_chunks_per_source()
+    if cap <= 0:
+        yield from hits
+        return
     counts: dict[int, int] = {}
-    kept: list[RetrievalHit] = []
     for hit in hits:
         seen = counts.get(hit.source_id, 0)
         if seen >= cap:
             continue
         counts[hit.source_id] = seen + 1
-        kept.append(hit)
-    return kept
+        yield hit
 
 
 def dedupe_hits(
-    hits: list[RetrievalHit], threshold: float | None = None, max_kept: int | None = None
+    hits: Iterable[RetrievalHit], threshold: float | None = None, max_kept: int | None = None
 ) -> list[RetrievalHit]:
     """Drop near-identical duplicate evidence, keeping the higher-scored hit.
 
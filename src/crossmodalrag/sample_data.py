@@ -1,23 +1,28 @@
 from __future__ import annotations
 
 import json
+import os
 import shutil
 import sqlite3
 import subprocess
 import tempfile
 from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
 from crossmodalrag.capabilities import has_ocr, has_pdf
+from crossmodalrag.evaluation import EvalQuery, upsert_eval_queries
 from crossmodalrag.ingest.git import ingest_git
 from crossmodalrag.ingest.image import ingest_images
 from crossmodalrag.ingest.notes import ingest_notes
 from crossmodalrag.ingest.pdf import ingest_pdf
-from crossmodalrag.usage.store import clear_usage_events, record_usage_event
+from crossmodalrag.usage.store import clear_usage_events, record_usage_events
 
 SAMPLE_AUTHOR_NAME = "Test User"
 SAMPLE_AUTHOR_EMAIL = "test@example.com"
 SAMPLE_SEED_VERSION = "v1"
+SAMPLE_BRANCH = "main"
 
 
 @dataclass(frozen=True)
@@ -57,27 +62,33 @@ def seed_sample_data(
     _materialize_sample_vault(vault_dir)
     _materialize_sample_git_repo(repo_dir)
 
-    notes_chunks_inserted = ingest_notes(conn, vault_path=vault_dir)
-    git_chunks_inserted = ingest_git(
-        conn,
-        repo_path=repo_dir,
-        max_commits=50,
-        target_author_name=SAMPLE_AUTHOR_NAME,
-        target_author_email=SAMPLE_AUTHOR_EMAIL,
-    )
-    # Cross-modal: ingest the sample PDF only when the [pdf] extra is present, so the
-    # seed path stays dependency-free. Without it the [sample-xmodal-text] PDF query
-    # simply stays at its ~0 baseline.
-    pdf_chunks_inserted = ingest_pdf(conn, pdf_path=vault_dir) if has_pdf() else 0
-    # Image OCR ingestion is likewise opt-in (requires the [ocr] extra + tesseract);
-    # without it the [sample-xmodal-*] image queries stay at their ~0 baseline.
-    image_chunks_inserted = ingest_images(conn, image_path=vault_dir) if has_ocr() else 0
-    eval_queries_upserted = _seed_eval_queries(conn, vault_dir=vault_dir, repo_dir=repo_dir)
-    # a deterministic synthetic usage history (reconcile-idempotent) so the time/usage
-    # signal is measurable before it's wired into ranking. Separable: never affects
-    # ingestion determinism or fingerprints.
-    usage_events_seeded = _seed_usage(conn, vault_dir=vault_dir)
-    conn.commit()
+    # Every DB write of the seed is one transaction: one commit, and a failure part-way leaves the
+    # database as it was.
+    with conn:
+        notes_chunks_inserted = ingest_notes(conn, vault_path=vault_dir, commit=False)
+        git_chunks_inserted = ingest_git(
+            conn,
+            repo_path=repo_dir,
+            max_commits=50,
+            target_author_name=SAMPLE_AUTHOR_NAME,
+            target_author_email=SAMPLE_AUTHOR_EMAIL,
+            commit=False,
+        )
+        # Cross-modal: ingest the sample PDF only when the [pdf] extra is present, so the
+        # seed path stays dependency-free. Without it the [sample-xmodal-text] PDF query
+        # simply stays at its ~0 baseline.
+        pdf_chunks_inserted = ingest_pdf(conn, pdf_path=vault_dir, commit=False) if has_pdf() else 0
+        # Image OCR ingestion is likewise opt-in (requires the [ocr] extra + tesseract);
+        # without it the [sample-xmodal-*] image queries stay at their ~0 baseline.
+        image_chunks_inserted = ingest_images(conn, image_path=vault_dir, commit=False) if has_ocr() else 0
+        eval_queries_upserted = _seed_eval_queries(conn, vault_dir=vault_dir, repo_dir=repo_dir)
+        # a deterministic synthetic usage history (reconcile-idempotent) so the time/usage
+        # signal is measurable before it's wired into ranking. Separable: never affects
+        # ingestion determinism or fingerprints.
+        usage_events_seeded = _seed_usage(conn, vault_dir=vault_dir)
+    # Once per seed, after the bulk writes: SQLite re-analyzes only the tables whose planner
+    # statistics this connection's queries showed to be missing or stale (usually none).
+    conn.execute("PRAGMA optimize")
 
     return SeedSampleResult(
         workspace_dir=workspace_dir,
@@ -96,49 +107,43 @@ def default_sample_db_path() -> Path:
     return Path(tempfile.gettempdir()) / "crossmodalrag-sample" / "memory.db"
 
 
+# Exact byte-prefix ranges (see _prefix_range) rather than LIKE: LIKE is ASCII case-insensitive and
+# treats the "_" in "sample_vault" as a wildcard, and neither range needs LIKE's index preconditions.
+_SAMPLE_SOURCE_WHERE = "(source_uri >= ? AND source_uri < ?) OR (source_uri >= ? AND source_uri < ?)"
+_SAMPLE_SOURCE_IDS_SQL = f"SELECT id FROM sources WHERE {_SAMPLE_SOURCE_WHERE}"
+# The usage/chunk statements re-run the (indexed) source predicate as a subquery: no id list
+# round-trips through Python, and no per-id placeholders to bump into SQLITE_MAX_VARIABLE_NUMBER.
+_SAMPLE_CHUNK_IDS_SQL = f"SELECT id FROM evidence_chunks WHERE source_id IN ({_SAMPLE_SOURCE_IDS_SQL})"
+_DELETE_SAMPLE_USAGE_SQL = (
+    f"DELETE FROM usage_events WHERE target_kind = 'chunk' AND target_id IN ({_SAMPLE_CHUNK_IDS_SQL})"
+)
+_DELETE_SAMPLE_CHUNKS_SQL = f"DELETE FROM evidence_chunks WHERE source_id IN ({_SAMPLE_SOURCE_IDS_SQL})"
+_DELETE_SAMPLE_SOURCES_SQL = f"DELETE FROM sources WHERE {_SAMPLE_SOURCE_WHERE}"
+
+
+def _prefix_range(prefix: str) -> tuple[str, str]:
+    """``[low, high)`` bounds holding exactly the strings that start with ``prefix`` (BINARY collation)."""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
 def purge_seeded_sample_data(conn: sqlite3.Connection, *, workspace_dir: Path) -> PurgeSampleResult:
     workspace_dir = workspace_dir.expanduser().resolve()
     vault_prefix = str((workspace_dir / "sample_vault").resolve())
     repo_prefix = str((workspace_dir / "sample_repo").resolve())
 
-    source_rows = conn.execute(
-        """
-        SELECT id
-        FROM sources
-        WHERE source_uri LIKE ? OR source_uri LIKE ?
-        """,
-        (f"{vault_prefix}/%", f"{repo_prefix}@%"),
-    ).fetchall()
-    source_ids = [int(row["id"]) for row in source_rows]
-
-    chunk_rows_deleted = 0
-    source_rows_deleted = 0
-    if source_ids:
-        placeholders = ",".join("?" for _ in source_ids)
+    # One transaction for the whole purge, as in seed_sample_data.
+    with conn:
+        params = (*_prefix_range(f"{vault_prefix}/"), *_prefix_range(f"{repo_prefix}@"))
         # Clear usage events for these chunks first, so none are orphaned by the chunk delete.
-        chunk_ids = [
-            int(r["id"])
-            for r in conn.execute(
-                f"SELECT id FROM evidence_chunks WHERE source_id IN ({placeholders})",
-                tuple(source_ids),
-            ).fetchall()
-        ]
-        clear_usage_events(conn, target_kind="chunk", target_ids=chunk_ids)
-        chunk_rows_deleted = conn.execute(
-            f"DELETE FROM evidence_chunks WHERE source_id IN ({placeholders})",
-            tuple(source_ids),
+        conn.execute(_DELETE_SAMPLE_USAGE_SQL, params)
+        chunk_rows_deleted = conn.execute(_DELETE_SAMPLE_CHUNKS_SQL, params).rowcount
+        source_rows_deleted = conn.execute(_DELETE_SAMPLE_SOURCES_SQL, params).rowcount
+
+        # '[sample%' (not '[sample]%') so both '[sample]' and '[sample-synth]' rows are purged.
+        # SQLite LIKE treats '[' literally; only '%'/'_' are wildcards.
+        eval_rows_deleted = conn.execute(
+            "DELETE FROM queries_eval WHERE query_text LIKE '[sample%'"
         ).rowcount
-        source_rows_deleted = conn.execute(
-            f"DELETE FROM sources WHERE id IN ({placeholders})",
-            tuple(source_ids),
-        ).rowcount
-
-    # '[sample%' (not '[sample]%') so both '[sample]' and '[sample-synth]' rows are purged.
-    # SQLite LIKE treats '[' literally; only '%'/'_' are wildcards.
-    eval_rows_deleted = conn.execute(
-        "DELETE FROM queries_eval WHERE query_text LIKE '[sample%'"
-    ).rowcount
-    conn.commit()
 
     return PurgeSampleResult(
         source_rows_deleted=max(source_rows_deleted, 0),
@@ -153,18 +158,26 @@ def _materialize_sample_vault(vault_dir: Path) -> None:
     if not fixture_vault.exists():
         raise FileNotFoundError(f"Sample vault fixture not found: {fixture_vault}")
 
-    for src in sorted(fixture_vault.rglob("*")):
-        if src.is_dir():
-            continue
-        rel = src.relative_to(fixture_vault)
-        dest = vault_dir / rel
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        if src.suffix == ".md":
-            dest.write_text(src.read_text(encoding="utf-8"), encoding="utf-8")
-        else:
-            # Cross-modal fixtures (PDF/image) are binary; copy bytes verbatim so
-            # their fingerprint is stable. Ingestion of these lands in steps 2-3.
-            dest.write_bytes(src.read_bytes())
+    rel_paths = _fixture_files(fixture_vault)
+    for parent in {(vault_dir / rel).parent for rel in rel_paths}:
+        parent.mkdir(parents=True, exist_ok=True)
+    for rel in rel_paths:
+        # Byte-for-byte (sendfile on Linux): notes need no decode/re-encode round trip, and the
+        # cross-modal PDF/image fixtures keep a stable fingerprint.
+        shutil.copyfile(fixture_vault / rel, vault_dir / rel)
+
+
+def _fixture_files(root: Path) -> list[str]:
+    """Sorted relative paths of the files under ``root``.
+
+    ``os.walk`` is built on ``os.scandir``, so files are told from directories by the listing
+    itself rather than one ``is_dir`` stat per path.
+    """
+    rel_paths: list[str] = []
+    for dirpath, _dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root)
+        rel_paths.extend(name if rel_dir == os.curdir else os.path.join(rel_dir, name) for name in filenames)
+    return sorted(rel_paths)
 
 
 def _materialize_sample_git_repo(repo_dir: Path) -> None:
@@ -181,29 +194,51 @@ def _materialize_sample_git_repo(repo_dir: Path) -> None:
     else:
         repo_dir.mkdir(parents=True, exist_ok=True)
 
-    _run_git(["git", "-C", str(repo_dir), "init"])
+    _run_git(["git", "-C", str(repo_dir), "init", "--initial-branch", SAMPLE_BRANCH])
     _run_git(["git", "-C", str(repo_dir), "config", "user.name", SAMPLE_AUTHOR_NAME])
     _run_git(["git", "-C", str(repo_dir), "config", "user.email", SAMPLE_AUTHOR_EMAIL])
 
-    commit_plan_path = _sample_seed_fixtures_root() / "git_commit_plan.json"
-    plan = json.loads(commit_plan_path.read_text(encoding="utf-8"))
+    # The whole plan goes through one `git fast-import` (no per-step add/commit processes or index
+    # rewrites); the resulting commits are byte-identical to committing each step by hand.
+    _run_git(["git", "-C", str(repo_dir), "fast-import", "--quiet"], stdin=_fast_import_stream(_load_commit_plan()))
+    _run_git(["git", "-C", str(repo_dir), "reset", "--quiet", "--hard"])
+
+    marker.write_text(SAMPLE_SEED_VERSION + "\n", encoding="utf-8")
+
+
+def _fast_import_stream(plan: tuple[dict, ...]) -> bytes:
+    """A `git fast-import` stream committing each plan step (files inline) onto ``SAMPLE_BRANCH``.
+
+    Each commit starts from its parent's tree, so files carry over between steps exactly as with
+    ``git add -A`` on a reused working tree.
+    """
+    out = bytearray()
+
+    def data(payload: bytes) -> None:
+        out.extend(b"data %d\n" % len(payload))
+        out.extend(payload)
+        out.extend(b"\n")
+
     for step in plan:
+        ident = f"{SAMPLE_AUTHOR_NAME} <{SAMPLE_AUTHOR_EMAIL}> {_git_raw_date(step['date'])}"
+        out.extend(f"commit refs/heads/{SAMPLE_BRANCH}\nauthor {ident}\ncommitter {ident}\n".encode("utf-8"))
+        # `git commit -m` stores the cleaned-up message with one trailing newline.
+        data((step["message"].strip() + "\n").encode("utf-8"))
         for rel_path, content in step["files"].items():
-            file_path = repo_dir / rel_path
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            file_path.write_text(content, encoding="utf-8")
-        _run_git(["git", "-C", str(repo_dir), "add", "-A"])
-        env = {
-            "GIT_AUTHOR_NAME": SAMPLE_AUTHOR_NAME,
-            "GIT_AUTHOR_EMAIL": SAMPLE_AUTHOR_EMAIL,
-            "GIT_COMMITTER_NAME": SAMPLE_AUTHOR_NAME,
-            "GIT_COMMITTER_EMAIL": SAMPLE_AUTHOR_EMAIL,
-            "GIT_AUTHOR_DATE": step["date"],
-            "GIT_COMMITTER_DATE": step["date"],
-        }
-        _run_git(["git", "-C", str(repo_dir), "commit", "-m", step["message"]], env=env)
+            out.extend(f"M 100644 inline {rel_path}\n".encode("utf-8"))
+            data(content.encode("utf-8"))
+    return bytes(out)
 
-    marker.write_text(SAMPLE_SEED_VERSION + "\n", encoding="utf-8")
+
+def _git_raw_date(value: str) -> str:
+    """An ISO-8601 plan date as git's raw ``<epoch> <+hhmm>`` form."""
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    offset_minutes = int(dt.utcoffset().total_seconds()) // 60
+    sign = "-" if offset_minutes < 0 else "+"
+    hours, minutes = divmod(abs(offset_minutes), 60)
+    return f"{int(dt.timestamp())} {sign}{hours:02d}{minutes:02d}"
 
 
 def _seed_eval_queries(conn: sqlite3.Connection, *, vault_dir: Path, repo_dir: Path) -> int:
@@ -228,24 +263,24 @@ def _seed_eval_queries(conn: sqlite3.Connection, *, vault_dir: Path, repo_dir: P
     chunking_late_uri = str((vault_dir / "concepts" / "chunking-late.md").resolve())
     provenance_uri = str((vault_dir / "concepts" / "provenance.md").resolve())
 
-    rows = [
+    rows: list[tuple[str, list[str]]] = [
         (
             "[sample] Where is the pipeline integrity smoke-test plan documented?",
-            json.dumps([note_project_uri]),
+            [note_project_uri],
         ),
         (
             "[sample] Which commit added the sample seeding command scaffold?",
-            json.dumps([f"{repo_dir.resolve()}@{scaffold_sha}"]),
+            [f"{repo_dir.resolve()}@{scaffold_sha}"],
         ),
         (
             "[sample] What issue was noted in the retrieval smoke test retro?",
-            json.dumps([note_retro_uri]),
+            [note_retro_uri],
         ),
         (
             # Negative case: nothing in the sample corpus answers this, so a
             # grounded system should abstain. Used by generation eval.
             "[sample] What were the quarterly revenue figures for the Tokyo office?",
-            json.dumps([]),
+            [],
         ),
         (
             # Synthesis case: answer aggregates across BOTH notes (the project plan
@@ -254,28 +289,28 @@ def _seed_eval_queries(conn: sqlite3.Connection, *, vault_dir: Path, repo_dir: P
             # coverage of memory-level vs flat retrieval in generation eval.
             "[sample-synth] How does the sample-seed smoke-test workflow help measure and "
             "track retrieval quality over time?",
-            json.dumps([note_project_uri, note_retro_uri]),
+            [note_project_uri, note_retro_uri],
         ),
         (
             # Synthesis case: spans the retro note (ranking issue) and the commit that
             # added the seeding-command scaffold referenced by that issue.
             "[sample-synth] What ranking issue was observed around the sample seeding command "
             "scaffold, and which commit added that scaffold?",
-            json.dumps([note_retro_uri, f"{repo_dir.resolve()}@{scaffold_sha}"]),
+            [note_retro_uri, f"{repo_dir.resolve()}@{scaffold_sha}"],
         ),
         (
             # Text-heavy cross-modal slice: the answer lives in the PDF's
             # extractable text — OCR/PDF-text-first should retrieve it.
             "[sample-xmodal-text] What is the minimum retrieval score below which the "
             "grounded answer gate abstains?",
-            json.dumps([pdf_spec_uri]),
+            [pdf_spec_uri],
         ),
         (
             # Text-heavy cross-modal slice: the answer is OCR-readable text rendered
             # in the screenshot.
             "[sample-xmodal-text] What action was recorded in the embeddings backfill retro "
             "screenshot?",
-            json.dumps([screenshot_uri]),
+            [screenshot_uri],
         ),
         (
             # Visual-heavy slice: the answer (the red middle/bottleneck stage) is encoded
@@ -284,7 +319,7 @@ def _seed_eval_queries(conn: sqlite3.Connection, *, vault_dir: Path, repo_dir: P
             # native-embedding gate exists to rescue.
             "[sample-xmodal-visual] In the architecture diagram, which processing stage is "
             "highlighted as the bottleneck?",
-            json.dumps([diagram_uri]),
+            [diagram_uri],
         ),
         (
             # Second visual-heavy query (gate hardening: n=2 reduces phrasing noise). The
@@ -293,7 +328,7 @@ def _seed_eval_queries(conn: sqlite3.Connection, *, vault_dir: Path, repo_dir: P
             # cannot retrieve it via an incidental word match.
             "[sample-xmodal-visual] In the architecture diagram, what colour fills the middle "
             "processing box?",
-            json.dumps([diagram_uri]),
+            [diagram_uri],
         ),
         (
             # Usage slice: gold is the heavily-reinforced project note (see
@@ -302,7 +337,7 @@ def _seed_eval_queries(conn: sqlite3.Connection, *, vault_dir: Path, repo_dir: P
             # tests/test_usage_scoring.py.
             "[sample-usage] Where is the pipeline integrity smoke-test plan and eval workflow "
             "documented?",
-            json.dumps([note_project_uri]),
+            [note_project_uri],
         ),
         (
             # Drift slice (drifting concept): the answer spans BOTH chunking notes, which
@@ -310,48 +345,21 @@ def _seed_eval_queries(conn: sqlite3.Connection, *, vault_dir: Path, repo_dir: P
             # Gold is multi-source so it exercises retrieval across the concept's drift.
             "[sample-drift] How did the chunking strategy change from fixed-size windows to "
             "structure-aware splitting?",
-            json.dumps([chunking_early_uri, chunking_late_uri]),
+            [chunking_early_uri, chunking_late_uri],
         ),
         (
             # Drift slice (stable control): the provenance principle is the non-drifting concept,
             # the baseline a drift metric should rank BELOW the chunking concept in step 2+.
             "[sample-drift] What is the provenance-first principle for grounded answers?",
-            json.dumps([provenance_uri]),
+            [provenance_uri],
         ),
     ]
-    for query_text, expected_source_uris in rows:
-        existing = conn.execute(
-            """
-            SELECT id, expected_source_uris
-            FROM queries_eval
-            WHERE query_text = ?
-            ORDER BY id ASC
-            """,
-            (query_text,),
-        ).fetchall()
-        if not existing:
-            conn.execute(
-                """
-                INSERT INTO queries_eval (query_text, expected_source_uris)
-                VALUES (?, ?)
-                """,
-                (query_text, expected_source_uris),
-            )
-            continue
-
-        canonical_id = int(existing[0]["id"])
-        if str(existing[0]["expected_source_uris"]) != expected_source_uris:
-            conn.execute(
-                """
-                UPDATE queries_eval
-                SET expected_source_uris = ?
-                WHERE id = ?
-                """,
-                (expected_source_uris, canonical_id),
-            )
-        for dup in existing[1:]:
-            conn.execute("DELETE FROM queries_eval WHERE id = ?", (int(dup["id"]),))
-    return len(rows)
+    # One batched upsert; the unique index on query_text (see db.init_db) keeps one row per query.
+    return upsert_eval_queries(
+        conn,
+        [EvalQuery(id=None, query_text=text, expected_source_uris=uris) for text, uris in rows],
+        commit=False,
+    )
 
 
 # Deterministic synthetic usage history. Fixed (source_uri, [(event_type,
@@ -404,37 +412,41 @@ def _seed_usage(conn: sqlite3.Connection, *, vault_dir: Path) -> int:
 
     target_ids = [chunk_id for chunk_id, _ in resolved]
     # Reconcile: clear this run's targets, then insert the fixed set -> identical state on re-seed.
-    clear_usage_events(conn, target_kind="chunk", target_ids=target_ids)
-    seeded = 0
-    for chunk_id, events in resolved:
-        for event_type, event_at in events:
-            record_usage_event(conn, "chunk", chunk_id, event_type, event_at=event_at)
-            seeded += 1
-    return seeded
+    clear_usage_events(conn, target_kind="chunk", target_ids=target_ids, commit=False)
+    return record_usage_events(
+        conn,
+        (("chunk", chunk_id, event_type, event_at) for chunk_id, events in resolved for event_type, event_at in events),
+    )
 
 
+@lru_cache(maxsize=1)
 def _sample_seed_fixtures_root() -> Path:
     repo_root = Path(__file__).resolve().parents[2]
     return repo_root / "tests" / "fixtures" / "sample_seed"
 
 
-def _run_git(cmd: list[str], env: dict[str, str] | None = None) -> None:
-    full_env = None
-    if env is not None:
-        import os
+@lru_cache(maxsize=1)
+def _load_commit_plan() -> tuple[dict, ...]:
+    """The sample repo's commit plan, parsed once per process (a tuple: the cached value is shared)."""
+    commit_plan_path = _sample_seed_fixtures_root() / "git_commit_plan.json"
+    return tuple(json.loads(commit_plan_path.read_text(encoding="utf-8")))
+
 
-        full_env = os.environ.copy()
-        full_env.update(env)
-    subprocess.run(cmd, check=True, capture_output=True, env=full_env)
+def _run_git(cmd: list[str], stdin: bytes | None = None) -> None:
+    subprocess.run(cmd, check=True, capture_output=True, input=stdin)
 
 
 def _git_rev_parse_subject(repo_dir: Path, subject: str) -> str:
+    # git filters the log (a fixed-string match anywhere in the message); only the few candidate
+    # lines come back, and the exact-subject check below keeps the lookup's semantics.
     completed = subprocess.run(
         [
             "git",
             "-C",
             str(repo_dir),
             "log",
+            "--fixed-strings",
+            f"--grep={subject}",
             "--format=%H%x1f%s",
         ],
         check=True,
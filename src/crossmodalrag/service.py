@@ -27,6 +27,7 @@ from crossmodalrag.generate.answer import generated_answer_to_dict, template_ans
 from crossmodalrag.generate.provider import LLMUnavailable, get_default_llm_provider
 from crossmodalrag.generate.synthesize import synthesize_answer, synthesize_answer_stream
 from crossmodalrag.memory.integrity import memory_stats
+from crossmodalrag.retrieve.cache import cached_retrieval
 from crossmodalrag.retrieve.hybrid import DEFAULT_PROFILE, retrieve
 from crossmodalrag.retrieve.nodes import candidate_chunk_ids, retrieve_nodes
 from crossmodalrag.retrieve.rerank import resolve_source_types
@@ -44,9 +45,33 @@ def retrieve_for_answer(
     """Retrieve evidence for a query, drilling memory-level entry points down to L0. Read-only.
 
     Returns ``(hits, matched_nodes)`` — the L0 evidence hits and (for non-`evidence` levels) the
-    matched memory nodes that were drilled down.
+    matched memory nodes that were drilled down. Repeats of the same request against an unchanged
+    DB are served from the in-process retrieval cache (see ``retrieve.cache``).
     """
     restrict_source_types = resolve_source_types(modalities)
+    key = (
+        query, top_k, profile, level,
+        None if restrict_source_types is None else frozenset(restrict_source_types),
+    )
+    return cached_retrieval(
+        conn,
+        key,
+        lambda: _retrieve_for_answer(
+            conn, query=query, top_k=top_k, profile=profile, level=level,
+            restrict_source_types=restrict_source_types,
+        ),
+    )
+
+
+def _retrieve_for_answer(
+    conn: sqlite3.Connection,
+    *,
+    query: str,
+    top_k: int,
+    profile: str,
+    level: str,
+    restrict_source_types: set[str] | None,
+):
     matched_nodes = []
     if level == "evidence":
         hits = retrieve(
@@ -11,6 +11,7 @@ from crossmodalrag.usage.store import (
     clear_usage_events,
     list_usage_events,
     record_usage_event,
+    record_usage_events,
     usage_summaries,
 )
 from crossmodalrag.usage.tracking import record_ask_interaction
@@ -38,6 +39,7 @@ __all__ = [
     "normalize_strength",
     "record_ask_interaction",
     "record_usage_event",
+    "record_usage_events",
     "rehearsal_strength",
     "summarize",
     "usage_summaries",
@@ -9,6 +9,7 @@ mirroring ``memory_edges``.
 from __future__ import annotations
 
 import sqlite3
+from collections.abc import Iterable
 
 from crossmodalrag.usage.strength import (
     UsageEvent,
@@ -18,6 +19,12 @@ from crossmodalrag.usage.strength import (
 )
 
 
+_INSERT_USAGE_EVENT_SQL = """
+    INSERT INTO usage_events (target_kind, target_id, event_type, weight, event_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
 def record_usage_event(
     conn: sqlite3.Connection,
     target_kind: str,
@@ -29,16 +36,21 @@ def record_usage_event(
 ) -> int:
     """Append a usage event. ``weight`` defaults from EVENT_WEIGHTS; ``event_at`` is explicit."""
     w = default_weight(event_type) if weight is None else float(weight)
-    cur = conn.execute(
-        """
-        INSERT INTO usage_events (target_kind, target_id, event_type, weight, event_at)
-        VALUES (?, ?, ?, ?, ?)
-        """,
-        (target_kind, int(target_id), event_type, w, event_at),
-    )
+    cur = conn.execute(_INSERT_USAGE_EVENT_SQL, (target_kind, int(target_id), event_type, w, event_at))
     return int(cur.lastrowid)
 
 
+def record_usage_events(conn: sqlite3.Connection, events: Iterable[tuple[str, int, str, str]]) -> int:
+    """Append ``(target_kind, target_id, event_type, event_at)`` events (default weights) with one
+    ``executemany``. Returns the number appended."""
+    rows = [
+        (target_kind, int(target_id), event_type, default_weight(event_type), event_at)
+        for target_kind, target_id, event_type, event_at in events
+    ]
+    conn.executemany(_INSERT_USAGE_EVENT_SQL, rows)
+    return len(rows)
+
+
 def list_usage_events(
     conn: sqlite3.Connection,
     *,
@@ -80,8 +92,9 @@ def clear_usage_events(
     *,
     target_kind: str | None = None,
     target_ids: list[int] | None = None,
+    commit: bool = True,
 ) -> int:
-    """Delete usage events (optionally scoped). Returns rows deleted. Commits."""
+    """Delete usage events (optionally scoped). Returns rows deleted. Commits unless ``commit=False``."""
     sql = "DELETE FROM usage_events"
     clauses: list[str] = []
     params: list[object] = []
@@ -97,7 +110,8 @@ def clear_usage_events(
     if clauses:
         sql += " WHERE " + " AND ".join(clauses)
     deleted = conn.execute(sql, tuple(params)).rowcount
-    conn.commit()
+    if commit:
+        conn.commit()
     return int(deleted)
 
 
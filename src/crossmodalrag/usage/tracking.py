@@ -11,7 +11,7 @@ import sqlite3
 from datetime import datetime
 from typing import Iterable
 
-from crossmodalrag.usage.store import record_usage_event
+from crossmodalrag.usage.store import record_usage_events
 
 
 def record_ask_interaction(
@@ -29,15 +29,11 @@ def record_ask_interaction(
     - ``opened_node_ids``     -> ``open`` (node): memory nodes drilled into (ask --level).
     """
     event_at = now.isoformat()
-    written = 0
-    for chunk_id in dict.fromkeys(retrieved_chunk_ids):  # de-dupe, preserve order
-        record_usage_event(conn, "chunk", int(chunk_id), "retrieval_hit", event_at=event_at)
-        written += 1
-    for chunk_id in dict.fromkeys(accepted_chunk_ids):
-        record_usage_event(conn, "chunk", int(chunk_id), "accepted_answer", event_at=event_at)
-        written += 1
-    for node_id in dict.fromkeys(opened_node_ids):
-        record_usage_event(conn, "node", int(node_id), "open", event_at=event_at)
-        written += 1
+    events = [
+        *(("chunk", chunk_id, "retrieval_hit", event_at) for chunk_id in dict.fromkeys(retrieved_chunk_ids)),
+        *(("chunk", chunk_id, "accepted_answer", event_at) for chunk_id in dict.fromkeys(accepted_chunk_ids)),
+        *(("node", node_id, "open", event_at) for node_id in dict.fromkeys(opened_node_ids)),
+    ]  # each id list de-duped, order preserved
+    written = record_usage_events(conn, events)
     conn.commit()
     return written
@@ -1,14 +1,19 @@
 """Shared test fixtures.
 
-The autouse guard below makes it impossible for any test — through any entry
+The autouse guards below make it impossible for any test — through any entry
 point — to write the *real* shared sample DB (``$TMPDIR/crossmodalrag-sample/``).
 That DB is a user-facing artifact (`mem seed-sample`); tests that seeded it left
 sources/gold pointing at deleted pytest workspaces, silently zeroing its eval
-metrics later.
+metrics later. Likewise the default main DB (``./data/memory.db``): a CLI test that
+never sets ``CMRAG_DB_PATH`` would otherwise create it in the checkout.
 """
 
 from __future__ import annotations
 
+import os
+import shutil
+import sqlite3
+from collections.abc import Iterator
 from pathlib import Path
 
 import pytest
@@ -25,3 +30,101 @@ def _isolate_default_sample_db(tmp_path: Path, monkeypatch: pytest.MonkeyPatch)
     # `cli` imports the function by name, so both references need the patch.
     monkeypatch.setattr(sample_data_mod, "default_sample_db_path", _isolated)
     monkeypatch.setattr(cli_mod, "default_sample_db_path", _isolated)
+
+
+@pytest.fixture(autouse=True)
+def _isolate_default_db(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Tests that need their own DB (or the unset-env default) still setenv/delenv over this.
+    monkeypatch.setenv("CMRAG_DB_PATH", str(tmp_path / "default-memory.db"))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _fast_sqlite() -> Iterator[None]:
+    # Opt-in (CMRAG_TEST_FAST_SQLITE=1): test DBs are throwaway, so skip fsync entirely. WAL stays on —
+    # the retrieval cache keys on the -wal sidecar, and tests should exercise the production journal.
+    if os.environ.get("CMRAG_TEST_FAST_SQLITE") != "1":
+        yield
+        return
+    from crossmodalrag import db
+
+    pragmas = tuple(
+        "PRAGMA synchronous=OFF" if pragma.startswith("PRAGMA synchronous=") else pragma
+        for pragma in db.CONNECTION_PRAGMAS
+    )
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(db, "CONNECTION_PRAGMAS", pragmas)
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _fresh_retrieval_cache():
+    # Tests swap providers/monkeypatch scorers mid-process; never let one test's hits leak into another.
+    from crossmodalrag.retrieve.cache import clear_retrieval_cache
+
+    clear_retrieval_cache()
+    yield
+    clear_retrieval_cache()
+
+
+@pytest.fixture(scope="session")
+def _template_db(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    from crossmodalrag.db import connect, init_db
+
+    path = tmp_path_factory.mktemp("template-db") / "mem.db"
+    conn = connect(path)
+    try:
+        init_db(conn)
+    finally:
+        conn.close()  # checkpoints the WAL: the main file alone holds the schema
+    return path
+
+
+@pytest.fixture
+def prepared_db(tmp_path: Path, _template_db: Path) -> Iterator[sqlite3.Connection]:
+    """An open connection to ``tmp_path / "mem.db"``, already through ``init_db``.
+
+    The schema is built once per session and copied per test instead of replaying the DDL each time.
+    """
+    from crossmodalrag.db import connect
+
+    db_path = tmp_path / "mem.db"
+    shutil.copyfile(_template_db, db_path)
+    conn = connect(db_path)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+@pytest.fixture(scope="session")
+def _seeded_template(tmp_path_factory: pytest.TempPathFactory):
+    from crossmodalrag.db import connect, init_db
+    from crossmodalrag.sample_data import seed_sample_data
+
+    base = tmp_path_factory.mktemp("seed-template")
+    conn = connect(base / "mem.db")
+    try:
+        init_db(conn)
+        result = seed_sample_data(conn, workspace_dir=base / "sample-workspace")
+    finally:
+        conn.close()
+    return base / "mem.db", result
+
+
+@pytest.fixture
+def seeded_db(tmp_path: Path, _seeded_template):
+    """``(conn, seed_result)``: a per-test copy of a database seeded once per session.
+
+    Source URIs point into the session's template workspace (``seed_result.workspace_dir``), which
+    is shared: re-seeding it is fine (identical bytes, a no-op), anything else must not modify it.
+    """
+    from crossmodalrag.db import connect
+
+    template_path, result = _seeded_template
+    db_path = tmp_path / "mem.db"
+    shutil.copyfile(template_path, db_path)
+    conn = connect(db_path)
+    try:
+        yield conn, result
+    finally:
+        conn.close()
@@ -157,3 +157,16 @@ def test_doctor_text_runs(monkeypatch, capsys, tmp_path):
     _run(monkeypatch, ["doctor"])
     out = capsys.readouterr().out
     assert "doctor" in out and "Ollama: reachable=False" in out
+
+
+def test_cli_import_defers_command_implementations() -> None:
+    import subprocess
+
+    code = (
+        "import sys, crossmodalrag.cli; "
+        "print(' '.join(m for m in ('crossmodalrag.evaluation', 'crossmodalrag.sample_data', "
+        "'crossmodalrag.service', 'crossmodalrag.generate.provider', 'crossmodalrag.ingest.git') "
+        "if m in sys.modules))"
+    )
+    loaded = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    assert loaded.stdout.strip() == ""
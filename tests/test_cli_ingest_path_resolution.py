@@ -56,7 +56,7 @@ def test_main_ingest_notes_uses_local_dotenv_paths_when_no_args(
 
     captured_paths: list[Path] = []
 
-    def _fake_ingest_notes_cmd(vault_paths: list[Path]) -> None:
+    def _fake_ingest_notes_cmd(vault_paths: list[Path], workers: int | None = None) -> None:
         captured_paths.extend(vault_paths)
 
     monkeypatch.setattr(cli, "ingest_notes_cmd", _fake_ingest_notes_cmd)
@@ -100,3 +100,88 @@ def test_parser_accepts_multiple_ingest_paths() -> None:
     assert git_args.command == "ingest-git"
     assert [str(path) for path in git_args.repo_paths] == ["repo1", "repo2"]
     assert git_args.max_commits == 25
+
+
+def test_ingest_notes_cmd_commits_all_vaults_in_one_transaction(
+    monkeypatch, tmp_path: Path
+) -> None:
+    from crossmodalrag.db import connect
+
+    db_path = tmp_path / "mem.db"
+    monkeypatch.setenv("CMRAG_DB_PATH", str(db_path))
+    monkeypatch.setattr(cli, "get_default_provider", lambda: None)
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "note.md").write_text("a note\n", encoding="utf-8")
+
+    # A bad vault after a good one rolls the whole ingest back: no partial commit.
+    with pytest.raises(FileNotFoundError):
+        cli.ingest_notes_cmd([vault, tmp_path / "missing"])
+    conn = connect(db_path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+    cli.ingest_notes_cmd([vault])
+    conn = connect(db_path)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0] == 1
+    finally:
+        conn.close()
+
+
+def test_ingest_notes_cmd_parallel_scan_writes_vaults_in_order(
+    monkeypatch, tmp_path: Path, capsys
+) -> None:
+    from crossmodalrag.db import connect
+
+    monkeypatch.setenv("CMRAG_DB_PATH", str(tmp_path / "mem.db"))
+    monkeypatch.setattr(cli, "get_default_provider", lambda: None)
+    vaults = []
+    for i in range(4):
+        vault = tmp_path / f"vault{i}"
+        vault.mkdir()
+        (vault / f"note{i}.md").write_text(f"note number {i}\n", encoding="utf-8")
+        vaults.append(vault)
+
+    cli.ingest_notes_cmd(vaults, workers=3)
+
+    out = capsys.readouterr().out
+    positions = [out.index(f"Ingested notes from {vault} ") for vault in vaults]
+    assert positions == sorted(positions)
+    conn = connect(tmp_path / "mem.db")
+    try:
+        titles = [r[0] for r in conn.execute("SELECT title FROM sources ORDER BY id")]
+    finally:
+        conn.close()
+    assert titles == ["note0", "note1", "note2", "note3"]
+
+
+@pytest.mark.parametrize(("vault_count", "workers", "read_workers"), [(4, 3, 1), (2, 8, 4), (1, 5, 5)])
+def test_ingest_notes_cmd_splits_the_worker_budget_across_vaults(
+    monkeypatch, tmp_path: Path, vault_count: int, workers: int, read_workers: int
+) -> None:
+    import crossmodalrag.ingest.notes as notes_mod
+
+    monkeypatch.setenv("CMRAG_DB_PATH", str(tmp_path / "mem.db"))
+    monkeypatch.setattr(cli, "get_default_provider", lambda: None)
+    seen: list[int | None] = []
+    real_scan_notes = notes_mod.scan_notes
+
+    def _scan_notes(vault_path, workers=None, known_stats=None):
+        seen.append(workers)
+        return real_scan_notes(vault_path, workers=workers, known_stats=known_stats)
+
+    monkeypatch.setattr(notes_mod, "scan_notes", _scan_notes)
+    vaults = []
+    for i in range(vault_count):
+        vault = tmp_path / f"vault{i}"
+        vault.mkdir()
+        (vault / "note.md").write_text(f"note {i}\n", encoding="utf-8")
+        vaults.append(vault)
+
+    cli.ingest_notes_cmd(vaults, workers=workers)
+    # Vaults scanned at once x threads per vault stays within --workers.
+    assert seen == [read_workers] * vault_count
+    assert min(vault_count, workers) * read_workers <= workers
@@ -221,3 +221,97 @@ def test_save_history_other_values_stay_on(monkeypatch):
 
     monkeypatch.setenv("CMRAG_SAVE_HISTORY", "anything-else")
     assert save_history_enabled() is True
+
+
+# --- memoized db path / .env loading ---------------------------------------------------
+
+
+def test_db_path_tracks_env_and_cwd_changes(monkeypatch, tmp_path):
+    from crossmodalrag.config import get_db_path
+
+    monkeypatch.setenv("CMRAG_DB_PATH", str(tmp_path / "a.db"))
+    assert get_db_path() == (tmp_path / "a.db").resolve()
+    monkeypatch.setenv("CMRAG_DB_PATH", str(tmp_path / "b.db"))
+    assert get_db_path() == (tmp_path / "b.db").resolve()
+    monkeypatch.delenv("CMRAG_DB_PATH")
+    monkeypatch.chdir(tmp_path)
+    assert get_db_path() == tmp_path / "data" / "memory.db"
+
+
+def test_load_dotenv_skips_unchanged_file_but_rereads_edits(monkeypatch, tmp_path):
+    from crossmodalrag.config import load_dotenv
+
+    env_file = tmp_path / ".env"
+    env_file.write_text("CMRAG_TEST_DOTENV_A=1\n", encoding="utf-8")
+    monkeypatch.delenv("CMRAG_TEST_DOTENV_A", raising=False)
+    monkeypatch.delenv("CMRAG_TEST_DOTENV_B", raising=False)
+    load_dotenv(env_file)
+    assert os.environ["CMRAG_TEST_DOTENV_A"] == "1"
+
+    monkeypatch.delenv("CMRAG_TEST_DOTENV_A")
+    load_dotenv(env_file)  # unchanged file: already applied, not re-parsed
+    assert "CMRAG_TEST_DOTENV_A" not in os.environ
+
+    env_file.write_text("CMRAG_TEST_DOTENV_B=2\n", encoding="utf-8")
+    os.utime(env_file, ns=(0, env_file.stat().st_mtime_ns + 1_000_000))
+    load_dotenv(env_file)
+    assert os.environ["CMRAG_TEST_DOTENV_B"] == "2"
+
+
+def test_load_dotenv_parses_quotes_comments_and_hash_in_values(monkeypatch, tmp_path):
+    from crossmodalrag.config import load_dotenv
+
+    env_file = tmp_path / ".env"
+    env_file.write_text(
+        "# comment=ignored\n"
+        "  CMRAG_TEST_DOTENV_Q = \"/tmp/vault #1\"  \r\n"
+        "not a pair\n"
+        "=no_key\n"
+        "CMRAG_TEST_DOTENV_S='a=b'\n",
+        encoding="utf-8",
+    )
+    for key in ("CMRAG_TEST_DOTENV_Q", "CMRAG_TEST_DOTENV_S"):
+        monkeypatch.delenv(key, raising=False)
+    load_dotenv(env_file)
+    assert os.environ["CMRAG_TEST_DOTENV_Q"] == "/tmp/vault #1"
+    assert os.environ["CMRAG_TEST_DOTENV_S"] == "a=b"
+    assert "comment" not in os.environ
+
+
+def test_init_db_skips_ddl_replay_once_schema_is_stamped(tmp_path):
+    from crossmodalrag.db import SCHEMA_VERSION
+
+    conn = connect(tmp_path / "mem.db")
+    try:
+        init_db(conn)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        statements: list[str] = []
+        conn.set_trace_callback(statements.append)
+        init_db(conn)
+        assert not [s for s in statements if "CREATE" in s]
+
+        conn.execute("DROP TABLE usage_events")  # a stamped DB missing an object still heals
+        conn.commit()
+        init_db(conn)
+        assert conn.execute("PRAGMA table_info(usage_events)").fetchall()
+    finally:
+        conn.close()
+
+
+def test_init_db_fast_path_holds_without_fts5(tmp_path, monkeypatch):
+    from crossmodalrag import db
+
+    # A SQLite build without FTS5: the candidate index is never created.
+    monkeypatch.setattr(db, "_fts5_available", lambda _conn: False)
+    # ("no such module: no_fts5" is the same OperationalError a build without FTS5 raises.)
+    monkeypatch.setattr(db, "_EVIDENCE_FTS_DDL", "CREATE VIRTUAL TABLE evidence_chunks_fts USING no_fts5(x);")
+    conn = connect(tmp_path / "mem.db")
+    try:
+        init_db(conn)
+        assert not db.has_evidence_fts(conn)
+        statements: list[str] = []
+        conn.set_trace_callback(statements.append)
+        init_db(conn)
+        assert not [s for s in statements if "CREATE" in s]
+    finally:
+        conn.close()
@@ -117,3 +117,34 @@ def test_eval_cmd_load_queries_warns_on_stderr_only(
     payload = json.loads(captured.out)
     # Warnings do not block loading: all three rows are upserted and evaluated.
     assert payload["query_count"] == 3
+
+
+def test_iter_eval_queries_file_feeds_upsert_directly(tmp_path: Path) -> None:
+    from crossmodalrag.evaluation import iter_eval_queries_file, list_eval_queries, upsert_eval_queries
+
+    path = tmp_path / "q.json"
+    path.write_text(
+        json.dumps(
+            [
+                {"query_text": " first ", "expected_source_uris": ["/a", " "]},
+                {"query_text": "second"},
+            ]
+        ),
+        encoding="utf-8",
+    )
+    conn = connect(tmp_path / "mem.db")
+    try:
+        init_db(conn)
+        assert upsert_eval_queries(conn, iter_eval_queries_file(path)) == 2
+        assert [(q.query_text, q.expected_source_uris) for q in list_eval_queries(conn)] == [
+            ("first", ["/a"]),
+            ("second", []),
+        ]
+    finally:
+        conn.close()
+
+    path.write_text(json.dumps([{"query_text": "ok"}, {"query_text": ""}]), encoding="utf-8")
+    rows = iter_eval_queries_file(path)
+    assert next(rows).query_text == "ok"  # rows are validated lazily, as they are reached
+    with pytest.raises(ValueError, match="row #2"):
+        next(rows)
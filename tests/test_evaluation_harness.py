@@ -5,67 +5,58 @@ from pathlib import Path
 
 from crossmodalrag.cli import build_parser, eval_cmd
 from crossmodalrag.db import connect, init_db
-from crossmodalrag.evaluation import load_eval_queries_file, run_eval, upsert_eval_queries
+from crossmodalrag.evaluation import EvalQuery, load_eval_queries_file, run_eval, upsert_eval_queries
 from crossmodalrag.sample_data import seed_sample_data
 
 
-def test_run_eval_computes_metrics_for_seeded_sample_queries(tmp_path: Path) -> None:
-    db_path = tmp_path / "mem.db"
+def test_run_eval_computes_metrics_for_seeded_sample_queries(tmp_path: Path, prepared_db) -> None:
     workspace_dir = tmp_path / "sample-workspace"
 
-    conn = connect(db_path)
-    try:
-        init_db(conn)
-        seed_result = seed_sample_data(conn, workspace_dir=workspace_dir)
-        assert seed_result.eval_queries_upserted == 13
-
-        summary = run_eval(conn, top_k=5, query_prefix="[sample]")
-        # '[sample]%' matches only the 4 specific-fact rows (not '[sample-synth]'); the 4th
-        # is a negative (abstain) case with no gold sources, which retrieval eval skips, so
-        # the 3 answerable specific-fact queries are scored.
-        assert summary.query_count == 3
-        assert summary.top_k == 5
-        assert 0.0 <= summary.recall_at_k <= 1.0
-        assert 0.0 <= summary.mrr_at_k <= 1.0
-        assert 0.0 <= summary.citation_hit_rate <= 1.0
-        assert summary.recall_at_k >= summary.citation_hit_rate
-        assert len(summary.results) == 3
-        assert all(result.expected_source_uris for result in summary.results)
-    finally:
-        conn.close()
-
-
-def test_run_eval_restrict_source_types_scopes_recall(tmp_path: Path) -> None:
-    conn = connect(tmp_path / "mem.db")
-    try:
-        init_db(conn)
-        # Two sources answering the same query, different modalities.
-        for stype, uri in (("note", "test://note/x"), ("pdf", "test://pdf/x")):
-            cur = conn.execute(
-                "INSERT INTO sources (source_type, source_uri, timestamp, title) VALUES (?, ?, ?, ?)",
-                (stype, uri, "2026-02-01T00:00:00+00:00", "x"),
-            )
-            sid = int(cur.lastrowid)
-            conn.execute(
-                "INSERT INTO evidence_chunks (source_id, chunk_index, chunk_text) VALUES (?, ?, ?)",
-                (sid, 0, "rate limit configuration default value"),
-            )
+    conn = prepared_db
+    seed_result = seed_sample_data(conn, workspace_dir=workspace_dir)
+    assert seed_result.eval_queries_upserted == 13
+
+    summary = run_eval(conn, top_k=5, query_prefix="[sample]")
+    # '[sample]%' matches only the 4 specific-fact rows (not '[sample-synth]'); the 4th
+    # is a negative (abstain) case with no gold sources, which retrieval eval skips, so
+    # the 3 answerable specific-fact queries are scored.
+    assert summary.query_count == 3
+    assert summary.top_k == 5
+    assert 0.0 <= summary.recall_at_k <= 1.0
+    assert 0.0 <= summary.mrr_at_k <= 1.0
+    assert 0.0 <= summary.citation_hit_rate <= 1.0
+    assert summary.recall_at_k >= summary.citation_hit_rate
+    assert len(summary.results) == 3
+    assert all(result.expected_source_uris for result in summary.results)
+
+
+def test_run_eval_restrict_source_types_scopes_recall(tmp_path: Path, prepared_db) -> None:
+    conn = prepared_db
+    # Two sources answering the same query, different modalities.
+    for stype, uri in (("note", "test://note/x"), ("pdf", "test://pdf/x")):
+        cur = conn.execute(
+            "INSERT INTO sources (source_type, source_uri, timestamp, title) VALUES (?, ?, ?, ?)",
+            (stype, uri, "2026-02-01T00:00:00+00:00", "x"),
+        )
+        sid = int(cur.lastrowid)
         conn.execute(
-            "INSERT INTO queries_eval (query_text, expected_source_uris) VALUES (?, ?)",
-            ("rate limit configuration default", json.dumps(["test://note/x", "test://pdf/x"])),
+            "INSERT INTO evidence_chunks (source_id, chunk_index, chunk_text) VALUES (?, ?, ?)",
+            (sid, 0, "rate limit configuration default value"),
         )
-        conn.commit()
+    conn.execute(
+        "INSERT INTO queries_eval (query_text, expected_source_uris) VALUES (?, ?)",
+        ("rate limit configuration default", json.dumps(["test://note/x", "test://pdf/x"])),
+    )
+    conn.commit()
 
-        both = run_eval(conn, top_k=5)
-        assert both.recall_at_k == 1.0
+    both = run_eval(conn, top_k=5)
+    assert both.recall_at_k == 1.0
 
-        pdf_only = run_eval(conn, top_k=5, restrict_source_types={"pdf"})
-        # Only the pdf source can be retrieved now; the note gold is unreachable but the
-        # pdf gold still satisfies recall for this query.
-        assert pdf_only.recall_at_k == 1.0
-        assert pdf_only.results[0].retrieved_source_uris == ["test://pdf/x"]
-    finally:
-        conn.close()
+    pdf_only = run_eval(conn, top_k=5, restrict_source_types={"pdf"})
+    # Only the pdf source can be retrieved now; the note gold is unreachable but the
+    # pdf gold still satisfies recall for this query.
+    assert pdf_only.recall_at_k == 1.0
+    assert pdf_only.results[0].retrieved_source_uris == ["test://pdf/x"]
 
 
 def test_eval_cmd_can_load_queries_and_print_metrics(tmp_path: Path, monkeypatch, capsys) -> None:
@@ -147,3 +138,63 @@ def test_cli_parser_accepts_eval_command() -> None:
     assert args.command == "eval"
     assert args.top_k == 7
     assert args.query_prefix == "[sample]"
+
+
+def test_init_db_collapses_legacy_duplicate_eval_queries(tmp_path: Path, prepared_db) -> None:
+    conn = prepared_db
+    # Simulate a pre-index database holding duplicate query rows.
+    conn.execute("DROP INDEX ux_queries_eval_text")
+    conn.executemany(
+        "INSERT INTO queries_eval (query_text, expected_source_uris) VALUES (?, ?)",
+        [("q", '["/a"]'), ("q", '["/b"]'), ("other", "[]")],
+    )
+    conn.commit()
+
+    init_db(conn)
+    rows = conn.execute(
+        "SELECT query_text, expected_source_uris FROM queries_eval ORDER BY id"
+    ).fetchall()
+    assert [tuple(r) for r in rows] == [("q", '["/a"]'), ("other", "[]")]
+
+    upsert_eval_queries(conn, [EvalQuery(id=None, query_text="q", expected_source_uris=["/c"])])
+    rows = conn.execute("SELECT expected_source_uris FROM queries_eval WHERE query_text = 'q'").fetchall()
+    assert [r["expected_source_uris"] for r in rows] == ['["/c"]']
+
+
+def test_retrieve_many_matches_per_query_retrieve(tmp_path: Path, prepared_db) -> None:
+    from crossmodalrag.evaluation import list_eval_queries
+    from crossmodalrag.retrieve.hybrid import retrieve, retrieve_many
+
+    conn = prepared_db
+    seed_sample_data(conn, workspace_dir=tmp_path / "sample-workspace")
+    queries = [q.query_text for q in list_eval_queries(conn)]
+    queries += ["difference between chunking and provenance", "!!!"]  # comparative + no tokens
+
+    batched = retrieve_many(conn, queries, top_k=5)
+    single = [retrieve(conn, query=q, top_k=5) for q in queries]
+    assert [[h.chunk_id for h in hits] for hits in batched] == [
+        [h.chunk_id for h in hits] for hits in single
+    ]
+    assert any(batched)
+
+
+def test_query_prefix_filter_uses_an_index_range_and_stays_case_insensitive(tmp_path: Path, prepared_db) -> None:
+    from crossmodalrag.evaluation import _LIST_EVAL_QUERIES_BY_PREFIX_SQL, list_eval_queries
+
+    conn = prepared_db
+    upsert_eval_queries(
+        conn,
+        [
+            EvalQuery(id=None, query_text=text, expected_source_uris=[])
+            for text in ("[sample] a", "[SAMPLE] b", "[other] c")
+        ],
+    )
+    plan = " ".join(
+        str(row[3])
+        for row in conn.execute(f"EXPLAIN QUERY PLAN {_LIST_EVAL_QUERIES_BY_PREFIX_SQL}", ("[sample]%",))
+    )
+    assert "idx_queries_eval_text_nocase" in plan
+    assert [q.query_text for q in list_eval_queries(conn, query_prefix="[sample]")] == [
+        "[sample] a",
+        "[SAMPLE] b",
+    ]
@@ -84,6 +84,22 @@ def test_render_plain_text_includes_evidence_map() -> None:
     assert "Because [E1]." in text
 
 
+@pytest.mark.parametrize(
+    "text",
+    [
+        "  short\n\ttext  ",
+        "+ line  of\tcode\n" * 500,  # the head alone flattens past the limit
+        " " * 2000 + "word " * 10,  # a whitespace-heavy head: falls back to the full text
+    ],
+)
+def test_preview_matches_split_join_flattening(text: str) -> None:
+    from crossmodalrag.generate.answer import _preview
+
+    flat = " ".join(text.split())
+    expected = flat if len(flat) <= 220 else f"{flat[:220].rstrip()}..."
+    assert _preview(text) == expected
+
+
 def test_json_contract_invariants() -> None:
     hits = [_hit(7, "evidence body")]
     gen = synthesize_answer("why", hits, StubLLMProvider(output="Because [E1]."), min_evidence_score=0.0)
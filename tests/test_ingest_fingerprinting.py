@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import os
+import sqlite3
 import subprocess
 from pathlib import Path
 
-from crossmodalrag.db import connect, init_db
+import pytest
+
+from crossmodalrag.chunking import CHUNKER_VERSION
+from crossmodalrag.ingest._chunks import insert_source_chunks
 from crossmodalrag.ingest.git import ingest_git
 from crossmodalrag.ingest.notes import ingest_notes
 
@@ -11,72 +16,209 @@ TEST_AUTHOR_NAME = "Test User"
 TEST_AUTHOR_EMAIL = "test@example.com"
 
 
-def test_ingest_notes_skips_unchanged(tmp_path: Path) -> None:
+def test_ingest_notes_skips_unchanged(tmp_path: Path, prepared_db) -> None:
     vault = tmp_path / "vault"
     vault.mkdir()
     note = vault / "daily.md"
     note.write_text("first version\nline two\n", encoding="utf-8")
 
-    conn = connect(tmp_path / "mem.db")
-    try:
-        init_db(conn)
-        first_inserted = ingest_notes(conn, vault)
-        assert first_inserted > 0
+    conn = prepared_db
+    first_inserted = ingest_notes(conn, vault)
+    assert first_inserted > 0
+
+    second_inserted = ingest_notes(conn, vault)
+    assert second_inserted == 0
 
-        second_inserted = ingest_notes(conn, vault)
-        assert second_inserted == 0
+    row = conn.execute(
+        "SELECT id, source_fingerprint FROM sources WHERE source_type = 'note'"
+    ).fetchone()
+    assert row is not None
+    assert row["source_fingerprint"] is not None
 
-        row = conn.execute(
-            "SELECT id, source_fingerprint FROM sources WHERE source_type = 'note'"
-        ).fetchone()
-        assert row is not None
-        assert row["source_fingerprint"] is not None
+    note.write_text("first version\nline two\nupdated\n", encoding="utf-8")
+    third_inserted = ingest_notes(conn, vault)
+    assert third_inserted > 0
 
-        note.write_text("first version\nline two\nupdated\n", encoding="utf-8")
-        third_inserted = ingest_notes(conn, vault)
-        assert third_inserted > 0
-    finally:
-        conn.close()
 
+def test_scan_notes_walks_like_rglob_but_skips_md_named_dirs(tmp_path: Path) -> None:
+    from crossmodalrag.ingest.notes import scan_notes
 
-def test_ingest_notes_backfills_legacy_fingerprint_without_reingest(tmp_path: Path) -> None:
+    vault = tmp_path / "vault"
+    (vault / "b" / "deep").mkdir(parents=True)
+    (vault / "archive.md").mkdir()  # a directory, not a note
+    (vault / "archive.md" / "inner.md").write_text("inner", encoding="utf-8")
+    (vault / "b" / "deep" / "z.md").write_text("z", encoding="utf-8")
+    (vault / "a.md").write_text("a", encoding="utf-8")
+    (vault / "b" / "skip.txt").write_text("not a note", encoding="utf-8")
+    (tmp_path / "elsewhere").mkdir()
+    (tmp_path / "elsewhere" / "linked.md").write_text("x", encoding="utf-8")
+    (vault / "link").symlink_to(tmp_path / "elsewhere", target_is_directory=True)
+
+    scanned = scan_notes(vault)
+    assert [n.path.relative_to(vault).as_posix() for n in scanned] == [
+        "a.md",
+        "archive.md/inner.md",
+        "b/deep/z.md",
+    ]
+    assert scanned[0].metadata_json == '{"bytes": 1, "fingerprint": "%s"}' % scanned[0].source_fingerprint
+    assert scanned[0].stat_signature is None  # just written: too recent to vouch for the content
+    assert scan_notes(vault, workers=1) == scanned  # the threaded read keeps sorted path order
+
+
+def test_failed_ingest_notes_rolls_back_the_whole_vault(tmp_path: Path, prepared_db) -> None:
     vault = tmp_path / "vault"
     vault.mkdir()
-    note = vault / "legacy.md"
-    note.write_text("legacy content\n", encoding="utf-8")
+    for name in ("a.md", "b.md"):
+        (vault / name).write_text(f"note {name}\n", encoding="utf-8")
 
-    conn = connect(tmp_path / "mem.db")
-    try:
-        init_db(conn)
-        source_uri = str(note.resolve())
+    def _fail_on_second(done: int, _total: int) -> None:
+        if done == 2:
+            raise RuntimeError("boom")
+
+    conn = prepared_db
+    with pytest.raises(RuntimeError):
+        ingest_notes(conn, vault, progress=_fail_on_second)
+    assert not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0] == 0
+    assert ingest_notes(conn, vault) > 0
+
+
+def test_ingest_notes_collapses_duplicate_source_rows(tmp_path: Path, prepared_db) -> None:
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    note = vault / "dup.md"
+    note.write_text("duplicate rows\n", encoding="utf-8")
+    other = vault / "other.md"
+    other.write_text("untouched\n", encoding="utf-8")
+
+    conn = prepared_db
+    ingest_notes(conn, vault)
+    uri = str(note.resolve())
+    for stamp in ("2020-01-01T00:00:00+00:00", "2021-01-01T00:00:00+00:00"):
         cur = conn.execute(
-            """
-            INSERT INTO sources (source_type, source_uri, timestamp, title, metadata_json)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            ("note", source_uri, _iso_from_mtime(note.stat().st_mtime), "legacy", "{}"),
+            "INSERT INTO sources (source_type, source_uri, timestamp, title) VALUES ('note', ?, ?, 'dup')",
+            (uri, stamp),
         )
-        source_id = int(cur.lastrowid)
         conn.execute(
-            """
-            INSERT INTO evidence_chunks (source_id, chunk_index, chunk_text, metadata_json)
-            VALUES (?, ?, ?, ?)
-            """,
-            (source_id, 0, "legacy content", "{}"),
+            "INSERT INTO evidence_chunks (source_id, chunk_index, chunk_text) VALUES (?, 0, 'stale')",
+            (cur.lastrowid,),
         )
-        conn.commit()
+    conn.commit()
 
-        inserted = ingest_notes(conn, vault)
-        assert inserted == 0
+    note.write_text("duplicate rows, edited\n", encoding="utf-8")
+    ingest_notes(conn, vault)
+    rows = conn.execute("SELECT source_uri, COUNT(*) FROM sources GROUP BY source_uri").fetchall()
+    assert sorted(tuple(row) for row in rows) == sorted([(uri, 1), (str(other.resolve()), 1)])
+    assert conn.execute("SELECT COUNT(*) FROM evidence_chunks WHERE chunk_text = 'stale'").fetchone()[0] == 0
 
-        row = conn.execute("SELECT source_fingerprint FROM sources WHERE id = ?", (source_id,)).fetchone()
-        assert row is not None
-        assert row["source_fingerprint"] is not None
-    finally:
-        conn.close()
 
+def test_insert_source_chunks_splits_statements_at_the_variable_limit(tmp_path: Path, prepared_db) -> None:
+    conn = prepared_db
+    conn.execute("INSERT INTO sources (source_type, source_uri, timestamp) VALUES ('note', '/n.md', '2026-01-01')")
+    conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 10)  # two rows per statement
+    chunks = [f"chunk {idx}" for idx in range(5)]
+    new_chunks = insert_source_chunks(conn, 1, chunks, "{}", with_ids=True)
+    assert [text for _, text in new_chunks] == chunks
+    rows = conn.execute("SELECT chunk_index, chunk_text FROM evidence_chunks ORDER BY id").fetchall()
+    assert [tuple(row) for row in rows] == list(enumerate(chunks))
 
-def test_ingest_git_skips_unchanged_and_backfills_legacy_fingerprint(tmp_path: Path, monkeypatch) -> None:
+
+def test_note_text_is_read_like_read_text(tmp_path: Path) -> None:
+    from crossmodalrag.ingest.notes import scan_notes
+
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    note = vault / "crlf.md"
+    note.write_bytes(b"title\r\nbody\rmore\xff\r\n\xc3\xa9\n")
+    (scanned,) = scan_notes(vault)
+    assert scanned.text == note.read_text(encoding="utf-8", errors="ignore") == "title\nbody\nmore\n\u00e9\n"
+
+
+def test_rescan_skips_notes_whose_stat_is_unchanged(tmp_path: Path, prepared_db) -> None:
+    from crossmodalrag.ingest.notes import load_note_stat_signatures, scan_notes
+
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    old, fresh = vault / "old.md", vault / "fresh.md"
+    old.write_text("settled note\n", encoding="utf-8")
+    fresh.write_text("just edited\n", encoding="utf-8")
+    os.utime(old, ns=(1_600_000_000 * 10**9, 1_600_000_000 * 10**9))
+
+    conn = prepared_db
+    assert ingest_notes(conn, vault) > 0
+    known = load_note_stat_signatures(conn)
+    assert set(known) == {str(old.resolve())}  # the racy-fresh note recorded no stat
+    assert [n.path for n in scan_notes(vault, known_stats=known)] == [fresh]
+
+    old.write_text("settled note, revised\n", encoding="utf-8")
+    os.utime(old, ns=(1_600_000_100 * 10**9, 1_600_000_100 * 10**9))
+    assert [n.path for n in scan_notes(vault, known_stats=known)] == [fresh, old]
+    assert ingest_notes(conn, vault) > 0
+    assert "revised" in conn.execute(
+        "SELECT group_concat(chunk_text) FROM evidence_chunks"
+    ).fetchone()[0]
+
+
+def test_unchanged_note_only_backfills_a_missing_stat_signature(tmp_path: Path, prepared_db) -> None:
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    note = vault / "note.md"
+    note.write_text("steady content\n", encoding="utf-8")
+
+    conn = prepared_db
+    ingest_notes(conn, vault)  # racy-fresh: no stat signature recorded yet
+
+    def row() -> tuple:
+        return tuple(conn.execute("SELECT metadata_json, stat_signature FROM sources").fetchone())
+
+    metadata_json, signature = row()
+    assert signature is None
+    os.utime(note, ns=(1_600_000_000 * 10**9, 1_600_000_000 * 10**9))  # now settled
+    assert ingest_notes(conn, vault) == 0
+    assert row() == (metadata_json, f"15:{1_600_000_000 * 10**9}:{CHUNKER_VERSION}")
+    assert "mtime" not in metadata_json  # the stat never leaks into exported metadata
+
+    # A touch with unchanged content re-reads the note but writes nothing.
+    os.utime(note, ns=(1_600_000_050 * 10**9, 1_600_000_050 * 10**9))
+    before = conn.total_changes
+    assert ingest_notes(conn, vault) == 0
+    assert conn.total_changes == before
+
+
+def test_ingest_notes_backfills_legacy_fingerprint_without_reingest(tmp_path: Path, prepared_db) -> None:
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    note = vault / "legacy.md"
+    note.write_text("legacy content\n", encoding="utf-8")
+
+    conn = prepared_db
+    source_uri = str(note.resolve())
+    cur = conn.execute(
+        """
+        INSERT INTO sources (source_type, source_uri, timestamp, title, metadata_json)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        ("note", source_uri, _iso_from_mtime(note.stat().st_mtime), "legacy", "{}"),
+    )
+    source_id = int(cur.lastrowid)
+    conn.execute(
+        """
+        INSERT INTO evidence_chunks (source_id, chunk_index, chunk_text, metadata_json)
+        VALUES (?, ?, ?, ?)
+        """,
+        (source_id, 0, "legacy content", "{}"),
+    )
+    conn.commit()
+
+    inserted = ingest_notes(conn, vault)
+    assert inserted == 0
+
+    row = conn.execute("SELECT source_fingerprint FROM sources WHERE id = ?", (source_id,)).fetchone()
+    assert row is not None
+    assert row["source_fingerprint"] is not None
+
+
+def test_ingest_git_skips_unchanged_and_backfills_legacy_fingerprint(tmp_path: Path, monkeypatch, prepared_db) -> None:
     repo = tmp_path / "repo"
     repo.mkdir()
     _run(["git", "-C", str(repo), "init"])
@@ -91,40 +233,36 @@ def test_ingest_git_skips_unchanged_and_backfills_legacy_fingerprint(tmp_path: P
     monkeypatch.setenv("TARGET_AUTHOR_NAME", TEST_AUTHOR_NAME)
     monkeypatch.setenv("TARGET_AUTHOR_EMAIL", TEST_AUTHOR_EMAIL)
 
-    conn = connect(tmp_path / "mem.db")
-    try:
-        init_db(conn)
-        first_inserted = ingest_git(conn, repo_path=repo, max_commits=10)
-        assert first_inserted > 0
-        second_inserted = ingest_git(conn, repo_path=repo, max_commits=10)
-        assert second_inserted == 0
-
-        row = conn.execute(
-            "SELECT id, source_uri, timestamp FROM sources WHERE source_type = 'git_commit'"
-        ).fetchone()
-        assert row is not None
-        source_id = int(row["id"])
-        source_uri = str(row["source_uri"])
-        timestamp = str(row["timestamp"])
-
-        conn.execute("UPDATE sources SET source_fingerprint = NULL WHERE id = ?", (source_id,))
-        conn.commit()
-
-        third_inserted = ingest_git(conn, repo_path=repo, max_commits=10)
-        assert third_inserted == 0
-        refetched = conn.execute(
-            "SELECT source_fingerprint, source_uri, timestamp FROM sources WHERE id = ?",
-            (source_id,),
-        ).fetchone()
-        assert refetched is not None
-        assert refetched["source_fingerprint"] is not None
-        assert refetched["source_uri"] == source_uri
-        assert refetched["timestamp"] == timestamp
-    finally:
-        conn.close()
-
-
-def test_repeated_ingestion_is_idempotent_for_persisted_data(tmp_path: Path, monkeypatch) -> None:
+    conn = prepared_db
+    first_inserted = ingest_git(conn, repo_path=repo, max_commits=10)
+    assert first_inserted > 0
+    second_inserted = ingest_git(conn, repo_path=repo, max_commits=10)
+    assert second_inserted == 0
+
+    row = conn.execute(
+        "SELECT id, source_uri, timestamp FROM sources WHERE source_type = 'git_commit'"
+    ).fetchone()
+    assert row is not None
+    source_id = int(row["id"])
+    source_uri = str(row["source_uri"])
+    timestamp = str(row["timestamp"])
+
+    conn.execute("UPDATE sources SET source_fingerprint = NULL WHERE id = ?", (source_id,))
+    conn.commit()
+
+    third_inserted = ingest_git(conn, repo_path=repo, max_commits=10)
+    assert third_inserted == 0
+    refetched = conn.execute(
+        "SELECT source_fingerprint, source_uri, timestamp FROM sources WHERE id = ?",
+        (source_id,),
+    ).fetchone()
+    assert refetched is not None
+    assert refetched["source_fingerprint"] is not None
+    assert refetched["source_uri"] == source_uri
+    assert refetched["timestamp"] == timestamp
+
+
+def test_repeated_ingestion_is_idempotent_for_persisted_data(tmp_path: Path, monkeypatch, prepared_db) -> None:
     vault = tmp_path / "vault"
     vault.mkdir()
     (vault / "note-a.md").write_text("alpha note\nline two\n", encoding="utf-8")
@@ -142,52 +280,44 @@ def test_repeated_ingestion_is_idempotent_for_persisted_data(tmp_path: Path, mon
     monkeypatch.setenv("TARGET_AUTHOR_NAME", TEST_AUTHOR_NAME)
     monkeypatch.setenv("TARGET_AUTHOR_EMAIL", TEST_AUTHOR_EMAIL)
 
-    conn = connect(tmp_path / "mem.db")
-    try:
-        init_db(conn)
-        notes_inserted_first = ingest_notes(conn, vault)
-        git_inserted_first = ingest_git(conn, repo_path=repo, max_commits=10)
-        assert notes_inserted_first > 0
-        assert git_inserted_first > 0
+    conn = prepared_db
+    notes_inserted_first = ingest_notes(conn, vault)
+    git_inserted_first = ingest_git(conn, repo_path=repo, max_commits=10)
+    assert notes_inserted_first > 0
+    assert git_inserted_first > 0
 
-        baseline = _data_snapshot(conn)
+    baseline = _data_snapshot(conn)
 
-        notes_inserted_second = ingest_notes(conn, vault)
-        git_inserted_second = ingest_git(conn, repo_path=repo, max_commits=10)
-        assert notes_inserted_second == 0
-        assert git_inserted_second == 0
+    notes_inserted_second = ingest_notes(conn, vault)
+    git_inserted_second = ingest_git(conn, repo_path=repo, max_commits=10)
+    assert notes_inserted_second == 0
+    assert git_inserted_second == 0
 
-        repeated = _data_snapshot(conn)
-        assert repeated == baseline
-    finally:
-        conn.close()
+    repeated = _data_snapshot(conn)
+    assert repeated == baseline
 
 
 def _run(cmd: list[str]) -> None:
     subprocess.run(cmd, check=True, capture_output=True, text=True)
 
 
-def test_ingest_notes_rechunks_when_chunker_version_changes(tmp_path: Path, monkeypatch) -> None:
+def test_ingest_notes_rechunks_when_chunker_version_changes(tmp_path: Path, monkeypatch, prepared_db) -> None:
     vault = tmp_path / "vault"
     vault.mkdir()
     (vault / "note.md").write_text("stable content\nline two\n", encoding="utf-8")
 
-    conn = connect(tmp_path / "mem.db")
-    try:
-        init_db(conn)
-        assert ingest_notes(conn, vault) > 0
-        assert ingest_notes(conn, vault) == 0
+    conn = prepared_db
+    assert ingest_notes(conn, vault) > 0
+    assert ingest_notes(conn, vault) == 0
 
-        # A chunker upgrade folds a new version into the fingerprint, so the
-        # skip is invalidated and the unchanged file re-chunks exactly once.
-        monkeypatch.setattr("crossmodalrag.ingest.notes.CHUNKER_VERSION", "test-bump")
-        assert ingest_notes(conn, vault) > 0
-        assert ingest_notes(conn, vault) == 0
-    finally:
-        conn.close()
+    # A chunker upgrade folds a new version into the fingerprint, so the
+    # skip is invalidated and the unchanged file re-chunks exactly once.
+    monkeypatch.setattr("crossmodalrag.ingest.notes.CHUNKER_VERSION", "test-bump")
+    assert ingest_notes(conn, vault) > 0
+    assert ingest_notes(conn, vault) == 0
 
 
-def test_ingest_git_rechunks_when_chunker_version_changes(tmp_path: Path, monkeypatch) -> None:
+def test_ingest_git_rechunks_when_chunker_version_changes(tmp_path: Path, monkeypatch, prepared_db) -> None:
     repo = tmp_path / "repo"
     repo.mkdir()
     _run(["git", "-C", str(repo), "init"])
@@ -200,17 +330,13 @@ def test_ingest_git_rechunks_when_chunker_version_changes(tmp_path: Path, monkey
     monkeypatch.setenv("TARGET_AUTHOR_NAME", TEST_AUTHOR_NAME)
     monkeypatch.setenv("TARGET_AUTHOR_EMAIL", TEST_AUTHOR_EMAIL)
 
-    conn = connect(tmp_path / "mem.db")
-    try:
-        init_db(conn)
-        assert ingest_git(conn, repo_path=repo, max_commits=10) > 0
-        assert ingest_git(conn, repo_path=repo, max_commits=10) == 0
-
-        monkeypatch.setattr("crossmodalrag.ingest.git.CHUNKER_VERSION", "test-bump")
-        assert ingest_git(conn, repo_path=repo, max_commits=10) > 0
-        assert ingest_git(conn, repo_path=repo, max_commits=10) == 0
-    finally:
-        conn.close()
+    conn = prepared_db
+    assert ingest_git(conn, repo_path=repo, max_commits=10) > 0
+    assert ingest_git(conn, repo_path=repo, max_commits=10) == 0
+
+    monkeypatch.setattr("crossmodalrag.ingest.git.CHUNKER_VERSION", "test-bump")
+    assert ingest_git(conn, repo_path=repo, max_commits=10) > 0
+    assert ingest_git(conn, repo_path=repo, max_commits=10) == 0
 
 
 def _data_snapshot(conn) -> tuple[list[tuple], list[tuple]]:
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import subprocess
+import sys
 from pathlib import Path
 
-from crossmodalrag.db import connect, init_db
+import pytest
+
 from crossmodalrag.ingest.git import ingest_git
 
 
@@ -12,7 +14,7 @@ TEST_AUTHOR_NAME = "Test User"
 TEST_AUTHOR_EMAIL = "test@example.com"
 
 
-def test_ingest_git_handles_empty_diff_commit_stably(tmp_path: Path, monkeypatch) -> None:
+def test_ingest_git_handles_empty_diff_commit_stably(tmp_path: Path, monkeypatch, prepared_db) -> None:
     repo = _init_repo(tmp_path)
     msg_path = FIXTURES_DIR / "empty_diff_commit_message.txt"
 
@@ -21,22 +23,18 @@ def test_ingest_git_handles_empty_diff_commit_stably(tmp_path: Path, monkeypatch
     monkeypatch.setenv("TARGET_AUTHOR_NAME", TEST_AUTHOR_NAME)
     monkeypatch.setenv("TARGET_AUTHOR_EMAIL", TEST_AUTHOR_EMAIL)
 
-    conn = connect(tmp_path / "mem.db")
-    try:
-        init_db(conn)
-        first_inserted = ingest_git(conn, repo_path=repo, max_commits=10)
-        assert first_inserted > 0
+    conn = prepared_db
+    first_inserted = ingest_git(conn, repo_path=repo, max_commits=10)
+    assert first_inserted > 0
 
-        baseline = _git_snapshot(conn)
-        second_inserted = ingest_git(conn, repo_path=repo, max_commits=10)
-        assert second_inserted == 0
-        assert _git_snapshot(conn) == baseline
-    finally:
-        conn.close()
+    baseline = _git_snapshot(conn)
+    second_inserted = ingest_git(conn, repo_path=repo, max_commits=10)
+    assert second_inserted == 0
+    assert _git_snapshot(conn) == baseline
 
 
 def test_ingest_git_handles_non_utf_content_and_encoding_stably(
-    tmp_path: Path, monkeypatch
+    tmp_path: Path, monkeypatch, prepared_db
 ) -> None:
     repo = _init_repo(tmp_path)
     payload = FIXTURES_DIR / "non_utf_payload.bin"
@@ -61,31 +59,84 @@ def test_ingest_git_handles_non_utf_content_and_encoding_stably(
     monkeypatch.setenv("TARGET_AUTHOR_NAME", TEST_AUTHOR_NAME)
     monkeypatch.setenv("TARGET_AUTHOR_EMAIL", TEST_AUTHOR_EMAIL)
 
-    conn = connect(tmp_path / "mem.db")
-    try:
-        init_db(conn)
-        first_inserted = ingest_git(conn, repo_path=repo, max_commits=10)
-        assert first_inserted > 0
-
-        row = conn.execute(
-            """
-            SELECT title, source_fingerprint
-            FROM sources
-            WHERE source_type = 'git_commit'
-            ORDER BY id DESC
-            LIMIT 1
-            """
-        ).fetchone()
-        assert row is not None
-        assert row["source_fingerprint"] is not None
-        assert row["title"] is not None
-
-        baseline = _git_snapshot(conn)
-        second_inserted = ingest_git(conn, repo_path=repo, max_commits=10)
-        assert second_inserted == 0
-        assert _git_snapshot(conn) == baseline
-    finally:
-        conn.close()
+    conn = prepared_db
+    first_inserted = ingest_git(conn, repo_path=repo, max_commits=10)
+    assert first_inserted > 0
+
+    row = conn.execute(
+        """
+        SELECT title, source_fingerprint
+        FROM sources
+        WHERE source_type = 'git_commit'
+        ORDER BY id DESC
+        LIMIT 1
+        """
+    ).fetchone()
+    assert row is not None
+    assert row["source_fingerprint"] is not None
+    assert row["title"] is not None
+
+    baseline = _git_snapshot(conn)
+    second_inserted = ingest_git(conn, repo_path=repo, max_commits=10)
+    assert second_inserted == 0
+    assert _git_snapshot(conn) == baseline
+
+
+@pytest.mark.parametrize("read_bytes", [7, 1 << 16], ids=["markers-straddle-reads", "default-reads"])
+def test_single_log_patches_match_per_commit_git_show(tmp_path: Path, monkeypatch, read_bytes: int) -> None:
+    # The fingerprint covers the patch text, so the one-`git log` reader must reproduce
+    # `git show --format= --patch --stat <sha>` byte for byte (or every commit would re-ingest).
+    from crossmodalrag.ingest import git as git_ingest
+    from crossmodalrag.ingest.git import scan_git
+
+    monkeypatch.setattr(git_ingest, "_STREAM_READ_BYTES", read_bytes)
+
+    repo = _init_repo(tmp_path)
+    (repo / "a.txt").write_text("a\n", encoding="utf-8")
+    _run(["git", "-C", str(repo), "add", "-A"])
+    _run(["git", "-C", str(repo), "commit", "-m", "first", "-m", "body\n---\nnot a diffstat"])
+    _run(["git", "-C", str(repo), "commit", "--allow-empty", "-m", "empty"])
+    (repo / "b.bin").write_bytes(b"\x00\x1e\x1dbin")
+    (repo / "c.txt").write_bytes(b"rs\x1ein text\r\nno newline")
+    _run(["git", "-C", str(repo), "add", "-A"])
+    _run(["git", "-C", str(repo), "commit", "-m", "binary and control bytes"])
+
+    rows = scan_git(repo, max_commits=10)
+    assert [row[2] for row in rows] == ["binary and control bytes", "empty", "first"]
+    for sha, *_, patch in rows:
+        shown = subprocess.run(
+            ["git", "-C", str(repo), "show", "--format=", "--patch", "--stat", sha],
+            check=True,
+            capture_output=True,
+        ).stdout.decode("utf-8", errors="replace")
+        assert patch == shown
+
+
+def test_streamed_git_log_failure_raises_with_stderr(tmp_path: Path, prepared_db) -> None:
+    repo = _init_repo(tmp_path)  # no commits yet: `git log` exits non-zero
+    conn = prepared_db
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        ingest_git(conn, repo_path=repo, target_author_name="x", target_author_email="y")
+    assert excinfo.value.stderr
+
+
+def test_streamed_reader_waits_for_a_child_that_exits_after_eof() -> None:
+    from crossmodalrag.ingest.git import _stream_git_records
+
+    # Closes stdout, then lingers before exiting 0: a normal EOF must not kill it.
+    script = "import os, sys, time; sys.stdout.write('@@a@@b'); sys.stdout.flush(); os.close(1); time.sleep(0.3)"
+    assert list(_stream_git_records([sys.executable, "-c", script], b"@@")) == [b"@@a", b"@@b"]
+
+
+def test_streamed_reader_kills_the_child_when_the_consumer_stops_early(monkeypatch) -> None:
+    from crossmodalrag.ingest import git as git_ingest
+    from crossmodalrag.ingest.git import _stream_git_records
+
+    monkeypatch.setattr(git_ingest, "_STREAM_READ_BYTES", 6)  # hand over the first record without EOF
+    script = "import sys, time; sys.stdout.write('@@a@@b'); sys.stdout.flush(); time.sleep(30)"
+    records = _stream_git_records([sys.executable, "-c", script], b"@@")
+    assert next(records) == b"@@a"
+    records.close()  # returns promptly instead of waiting out the sleep
 
 
 def _init_repo(tmp_path: Path) -> Path:
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timezone
+from pathlib import Path
+
+from crossmodalrag.db import EVIDENCE_FTS_TABLE, connect, has_evidence_fts, init_db
+from crossmodalrag.retrieve import lexical
+
+_TEXTS = [
+    "The F_1 score rose after tuning.",
+    "plain f1 mention",
+    "Café notes about caf caching",
+    "naïve baseline",
+    "unrelated text entirely",
+]
+
+
+def _seed(conn) -> None:
+    conn.execute(
+        "INSERT INTO sources (source_type, source_uri, timestamp, title) VALUES ('note', '/n.md', '2026-01-01', 'n')"
+    )
+    for idx, text in enumerate(_TEXTS):
+        conn.execute(
+            "INSERT INTO evidence_chunks (source_id, chunk_index, chunk_text) VALUES (1, ?, ?)",
+            (idx, text),
+        )
+    conn.commit()
+
+
+def _ranked(conn, queries: list[str]) -> list[list[tuple[int, float]]]:
+    return [
+        [(hit.chunk_id, hit.score) for hit in hits]
+        for hits in lexical.retrieve_many(conn, queries, top_k=10)
+    ]
+
+
+def test_fts_prefilter_matches_full_scan(tmp_path: Path, monkeypatch) -> None:
+    conn = connect(tmp_path / "mem.db")
+    try:
+        init_db(conn)
+        _seed(conn)
+        conn.execute("UPDATE evidence_chunks SET chunk_text = 'renamed f_1 text' WHERE id = 5")
+        conn.execute("DELETE FROM evidence_chunks WHERE id = 2")
+        conn.commit()
+        # Squashed underscores (f1 ~ F_1), non-ASCII splits (caf, ve), FTS keywords as terms.
+        queries = ["f1", "F_1 score", "caf", "ve", "or not and", "renamed", "unrelated"]
+        with_fts = _ranked(conn, queries)
+        monkeypatch.setattr(lexical, "has_evidence_fts", lambda _conn: False)
+        assert with_fts == _ranked(conn, queries)
+        assert sorted(chunk_id for chunk_id, _ in with_fts[0]) == [1, 5]
+        assert with_fts[6] == []  # the only "unrelated" chunk was rewritten
+    finally:
+        conn.close()
+
+
+def test_init_db_backfills_fts_for_existing_chunks(tmp_path: Path) -> None:
+    conn = connect(tmp_path / "mem.db")
+    try:
+        init_db(conn)
+        for trigger in ("evidence_chunks_fts_ai", "evidence_chunks_fts_ad", "evidence_chunks_fts_au"):
+            conn.execute(f"DROP TRIGGER {trigger}")
+        conn.execute(f"DROP TABLE {EVIDENCE_FTS_TABLE}")
+        _seed(conn)  # a pre-FTS database
+        assert not has_evidence_fts(conn)
+
+        init_db(conn)
+        assert has_evidence_fts(conn)
+        assert [hit.chunk_id for hit in lexical.retrieve(conn, "baseline")] == [4]
+    finally:
+        conn.close()
+
+
+def test_restrictions_are_applied_in_sql(tmp_path: Path) -> None:
+    conn = connect(tmp_path / "mem.db")
+    try:
+        init_db(conn)
+        _seed(conn)
+        conn.execute(
+            "INSERT INTO sources (source_type, source_uri, timestamp, title) VALUES ('git', 'r@1', '2026-01-01', 'c')"
+        )
+        conn.execute("INSERT INTO evidence_chunks (source_id, chunk_index, chunk_text) VALUES (2, 0, 'f1 in git')")
+        conn.commit()
+
+        def ids(**kwargs) -> list[int]:
+            return sorted(hit.chunk_id for hit in lexical.retrieve(conn, "f1", top_k=10, **kwargs))
+
+        assert ids() == [1, 2, 6]
+        assert ids(restrict_source_types={"git"}) == [6]
+        assert ids(restrict_chunk_ids={2, 3, 6}) == [2, 6]
+        assert ids(restrict_chunk_ids={1, 6}, restrict_source_types={"note"}) == [1]
+        assert ids(restrict_chunk_ids=set()) == []
+        assert ids(restrict_source_types=set()) == []
+    finally:
+        conn.close()
+
+
+def test_recency_cache_matches_uncached_scores() -> None:
+    now = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+    cache: dict[str, float] = {}
+    for timestamp in ("2026-01-15T12:00:00Z", "2026-01-15", "2026-02-28T13:00:00+00:00", "garbage", "", None):
+        expected = lexical.recency_score(timestamp, now=now)
+        assert lexical.recency_score(timestamp, now=now, cache=cache) == expected
+        assert lexical.recency_score(timestamp, now=now, cache=cache) == expected
+    assert lexical.recency_score("2026-01-15", now=now) == math.exp(-45 / 45.0)
+    assert sorted(cache) == ["2026-01-15", "2026-01-15T12:00:00Z", "2026-02-28T13:00:00+00:00", "garbage"]
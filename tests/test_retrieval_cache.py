@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import crossmodalrag.service as svc
+from crossmodalrag.db import connect, init_db
+from crossmodalrag.ingest.notes import ingest_notes
+
+
+def _counting_retrieve(monkeypatch) -> list[str]:
+    calls: list[str] = []
+    real = svc.retrieve
+
+    def _retrieve(conn, query, **kwargs):
+        calls.append(query)
+        return real(conn, query=query, **kwargs)
+
+    monkeypatch.setattr(svc, "retrieve", _retrieve)
+    monkeypatch.setattr("crossmodalrag.retrieve.hybrid.get_default_provider", lambda: None)
+    return calls
+
+
+def _vault(tmp_path: Path) -> Path:
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "fingerprint.md").write_text("Fingerprint skips unchanged notes.\n", encoding="utf-8")
+    return vault
+
+
+def test_repeat_query_is_served_from_cache_until_a_commit(tmp_path: Path, monkeypatch) -> None:
+    calls = _counting_retrieve(monkeypatch)
+    vault = _vault(tmp_path)
+    conn = connect(tmp_path / "mem.db")
+    try:
+        init_db(conn)
+        ingest_notes(conn, vault)
+        first, _ = svc.retrieve_for_answer(conn, query="fingerprint")
+        first[0].score = -1.0  # callers get copies; the cached hit is untouched
+        second, _ = svc.retrieve_for_answer(conn, query="fingerprint")
+        assert calls == ["fingerprint"]
+        assert second[0].score > 0
+
+        (vault / "other.md").write_text("Another fingerprint note.\n", encoding="utf-8")
+        ingest_notes(conn, vault)  # commits: the DB state token changes
+        third, _ = svc.retrieve_for_answer(conn, query="fingerprint")
+        assert calls == ["fingerprint", "fingerprint"]
+        assert len(third) == 2
+    finally:
+        conn.close()
+
+
+def test_rerank_env_change_misses_cache(tmp_path: Path, monkeypatch) -> None:
+    calls = _counting_retrieve(monkeypatch)
+    conn = connect(tmp_path / "mem.db")
+    try:
+        init_db(conn)
+        ingest_notes(conn, _vault(tmp_path))
+        svc.retrieve_for_answer(conn, query="fingerprint")
+        monkeypatch.setenv("CMRAG_MAX_CHUNKS_PER_SOURCE", "0")
+        svc.retrieve_for_answer(conn, query="fingerprint")
+        monkeypatch.setenv("CMRAG_DEDUPE_THRESHOLD", "0.5")
+        svc.retrieve_for_answer(conn, query="fingerprint")
+        svc.retrieve_for_answer(conn, query="fingerprint")
+        assert calls == ["fingerprint"] * 3
+    finally:
+        conn.close()
+
+
+def test_open_transaction_bypasses_cache(tmp_path: Path, monkeypatch) -> None:
+    calls = _counting_retrieve(monkeypatch)
+    conn = connect(tmp_path / "mem.db")
+    try:
+        init_db(conn)
+        ingest_notes(conn, _vault(tmp_path))
+        conn.execute("DELETE FROM evidence_chunks")  # uncommitted: not visible on disk
+        assert svc.retrieve_for_answer(conn, query="fingerprint")[0] == []
+        assert svc.retrieve_for_answer(conn, query="fingerprint")[0] == []
+        assert calls == ["fingerprint", "fingerprint"]
+    finally:
+        conn.close()
+
+
+def test_wal_restart_with_same_size_and_mtime_misses_cache(tmp_path: Path, monkeypatch) -> None:
+    import os
+
+    from crossmodalrag.retrieve import cache
+
+    calls = _counting_retrieve(monkeypatch)
+    real_stat = os.stat
+
+    def _coarse_stat(path, *args, **kwargs):
+        # A filesystem with coarse mtimes: the cache's stats all report the same timestamp.
+        result = real_stat(path, *args, **kwargs)
+        return os.stat_result(tuple(result[:10]), {"st_mtime_ns": 0})
+
+    conn = connect(tmp_path / "mem.db")
+    try:
+        init_db(conn)
+        ingest_notes(conn, _vault(tmp_path))
+        monkeypatch.setattr(cache.os, "stat", _coarse_stat)
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)")  # main file final; the WAL keeps its size
+        wal = Path(f"{tmp_path / 'mem.db'}-wal")
+        size = wal.stat().st_size
+        assert len(svc.retrieve_for_answer(conn, query="fingerprint")[0]) == 1
+        conn.execute("DELETE FROM evidence_chunks")  # restarts the WAL from its first frame
+        conn.commit()
+        assert wal.stat().st_size == size
+        assert svc.retrieve_for_answer(conn, query="fingerprint")[0] == []
+        assert calls == ["fingerprint", "fingerprint"]
+    finally:
+        conn.close()
@@ -1,48 +1,71 @@
 from __future__ import annotations
 
+import os
+import subprocess
 from pathlib import Path
 
+import pytest
+
 from crossmodalrag.cli import build_parser, seed_sample_cmd
 from crossmodalrag.db import connect, init_db
 from crossmodalrag.retrieve.lexical import retrieve
-from crossmodalrag.sample_data import default_sample_db_path, purge_seeded_sample_data, seed_sample_data
-
+from crossmodalrag.sample_data import (
+    SAMPLE_AUTHOR_EMAIL,
+    SAMPLE_AUTHOR_NAME,
+    _SAMPLE_SOURCE_IDS_SQL,
+    _load_commit_plan,
+    _materialize_sample_git_repo,
+    default_sample_db_path,
+    purge_seeded_sample_data,
+    seed_sample_data,
+)
+from crossmodalrag.usage.store import record_usage_events
+
+
+def test_seed_sample_data_is_reusable_and_idempotent(seeded_db) -> None:
+    conn, first = seeded_db
+    assert first.notes_chunks_inserted > 0
+    assert first.git_chunks_inserted > 0
+    assert first.eval_queries_upserted == 13
+    assert first.usage_events_seeded > 0  # deterministic synthetic usage history (broadcast over chunks)
+    assert (first.vault_dir / "projects" / "crossmodalrag.md").exists()
+    assert (first.repo_dir / ".git").exists()
+
+    hits = retrieve(conn, query="seeding command scaffold", top_k=5)
+    assert hits
+    assert any(hit.source_type == "git_commit" for hit in hits)
+
+    baseline = _seed_snapshot(conn)
+
+    usage_before = _usage_snapshot(conn)
+
+    second = seed_sample_data(conn, workspace_dir=first.workspace_dir)
+    assert second.notes_chunks_inserted == 0
+    assert second.git_chunks_inserted == 0
+    # Re-seeding is a no-op whether or not the [pdf] extra ingested the sample PDF.
+    assert second.pdf_chunks_inserted == 0
+    assert second.image_chunks_inserted == 0
+    assert second.eval_queries_upserted == 13
+
+    assert _seed_snapshot(conn) == baseline
+    # Usage seeding is reconcile-idempotent: re-seed leaves an identical event set.
+    assert _usage_snapshot(conn) == usage_before
+
+
+def test_failed_seed_rolls_back_every_write(tmp_path: Path, monkeypatch) -> None:
+    import crossmodalrag.sample_data as sample_data_mod
 
-def test_seed_sample_data_is_reusable_and_idempotent(tmp_path: Path) -> None:
-    db_path = tmp_path / "mem.db"
-    workspace_dir = tmp_path / "sample-workspace"
+    def _boom(conn, *, vault_dir):
+        raise RuntimeError("usage seeding failed")
 
-    conn = connect(db_path)
+    monkeypatch.setattr(sample_data_mod, "_seed_usage", _boom)
+    conn = connect(tmp_path / "mem.db")
     try:
         init_db(conn)
-
-        first = seed_sample_data(conn, workspace_dir=workspace_dir)
-        assert first.notes_chunks_inserted > 0
-        assert first.git_chunks_inserted > 0
-        assert first.eval_queries_upserted == 13
-        assert first.usage_events_seeded > 0  # deterministic synthetic usage history (broadcast over chunks)
-        assert (first.vault_dir / "projects" / "crossmodalrag.md").exists()
-        assert (first.repo_dir / ".git").exists()
-
-        hits = retrieve(conn, query="seeding command scaffold", top_k=5)
-        assert hits
-        assert any(hit.source_type == "git_commit" for hit in hits)
-
-        baseline = _seed_snapshot(conn)
-
-        usage_before = _usage_snapshot(conn)
-
-        second = seed_sample_data(conn, workspace_dir=workspace_dir)
-        assert second.notes_chunks_inserted == 0
-        assert second.git_chunks_inserted == 0
-        # Re-seeding is a no-op whether or not the [pdf] extra ingested the sample PDF.
-        assert second.pdf_chunks_inserted == 0
-        assert second.image_chunks_inserted == 0
-        assert second.eval_queries_upserted == 13
-
-        assert _seed_snapshot(conn) == baseline
-        # Usage seeding is reconcile-idempotent: re-seed leaves an identical event set.
-        assert _usage_snapshot(conn) == usage_before
+        with pytest.raises(RuntimeError):
+            seed_sample_data(conn, workspace_dir=tmp_path / "sample-workspace")
+        for table in ("sources", "evidence_chunks", "queries_eval"):
+            assert conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 0
     finally:
         conn.close()
 
@@ -84,67 +107,125 @@ def test_seed_sample_command_uses_separate_default_temp_db(tmp_path: Path, monke
     assert default_sample_db_path().is_relative_to(tmp_path)
 
 
-def test_purge_seeded_sample_data_removes_only_sample_rows(tmp_path: Path) -> None:
-    db_path = tmp_path / "mem.db"
-    workspace_dir = tmp_path / "sample-workspace"
-
-    conn = connect(db_path)
-    try:
-        init_db(conn)
-        seed_sample_data(conn, workspace_dir=workspace_dir)
-
-        cur = conn.execute(
+def _insert_personal_rows(conn, rows: list[tuple[str, str, str]]) -> None:
+    """Insert non-sample ``(source_uri, title, chunk_text)`` notes, one chunk each, in one transaction."""
+    with conn:
+        conn.executemany(
             """
             INSERT INTO sources (source_type, source_uri, source_fingerprint, timestamp, title, metadata_json)
-            VALUES (?, ?, ?, ?, ?, ?)
+            VALUES ('note', ?, 'abc123', '2026-02-01T00:00:00+00:00', ?, '{}')
             """,
-            (
-                "note",
-                str((tmp_path / "personal" / "journal.md").resolve()),
-                "abc123",
-                "2026-02-01T00:00:00+00:00",
-                "journal",
-                "{}",
-            ),
+            [(uri, title) for uri, title, _ in rows],
         )
-        personal_source_id = int(cur.lastrowid)
-        conn.execute(
+        conn.executemany(
             """
             INSERT INTO evidence_chunks (source_id, chunk_index, chunk_text, metadata_json)
-            VALUES (?, ?, ?, ?)
+            SELECT id, 0, ?, '{}' FROM sources WHERE source_type = 'note' AND source_uri = ?
             """,
-            (personal_source_id, 0, "personal note", "{}"),
+            [(text, uri) for uri, _, text in rows],
         )
-        conn.commit()
-
-        assert conn.execute("SELECT COUNT(*) FROM usage_events").fetchone()[0] > 0  # seeded
-
-        result = purge_seeded_sample_data(conn, workspace_dir=workspace_dir)
-        assert result.source_rows_deleted > 0
-        assert result.chunk_rows_deleted > 0
-        assert result.eval_rows_deleted == 13
-        # Seeded usage is cleared with the sample chunks (no orphaned usage events).
-        assert conn.execute("SELECT COUNT(*) FROM usage_events").fetchone()[0] == 0
-
-        remaining_sources = conn.execute(
-            "SELECT source_uri FROM sources ORDER BY id"
-        ).fetchall()
-        assert [row["source_uri"] for row in remaining_sources] == [
-            str((tmp_path / "personal" / "journal.md").resolve())
-        ]
-    finally:
-        conn.close()
+
+
+def test_purge_seeded_sample_data_removes_only_sample_rows(tmp_path: Path, seeded_db) -> None:
+    conn, seeded = seeded_db
+    workspace_dir = seeded.workspace_dir
+
+    personal_uri = str((tmp_path / "personal" / "journal.md").resolve())
+    _insert_personal_rows(conn, [(personal_uri, "journal", "personal note")])
+    personal_chunk_id = conn.execute(
+        "SELECT c.id FROM evidence_chunks c JOIN sources s ON s.id = c.source_id WHERE s.source_uri = ?",
+        (personal_uri,),
+    ).fetchone()[0]
+    with conn:
+        record_usage_events(conn, [("chunk", personal_chunk_id, "open", "2026-02-02T00:00:00+00:00")])
+
+    assert conn.execute("SELECT COUNT(*) FROM usage_events").fetchone()[0] > 1  # seeded + personal
+
+    result = purge_seeded_sample_data(conn, workspace_dir=workspace_dir)
+    assert result.source_rows_deleted > 0
+    assert result.chunk_rows_deleted > 0
+    assert result.eval_rows_deleted == 13
+    # Seeded usage is cleared with the sample chunks (no orphaned usage events); personal usage stays.
+    assert [row[0] for row in conn.execute("SELECT target_id FROM usage_events")] == [personal_chunk_id]
+
+    remaining_sources = conn.execute(
+        "SELECT source_uri FROM sources ORDER BY id"
+    ).fetchall()
+    assert [row["source_uri"] for row in remaining_sources] == [personal_uri]
+
+
+def test_purge_matches_sample_prefixes_exactly_via_the_uri_index(tmp_path: Path, prepared_db) -> None:
+    conn = prepared_db
+    workspace_dir = (tmp_path / "sample-workspace").resolve()
+    uris = [
+        f"{workspace_dir}/sample_vault/a.md",
+        f"{workspace_dir}/sample_repo@abc123",
+        # LIKE would take both of these: "_" is a wildcard and ASCII matching is case-insensitive.
+        f"{workspace_dir}/sampleXvault/b.md",
+        f"{workspace_dir}/SAMPLE_VAULT/c.md",
+        f"{workspace_dir}/sample_vault0",
+    ]
+    conn.executemany(
+        "INSERT INTO sources (source_type, source_uri, timestamp) VALUES ('note', ?, '2026-01-01')",
+        [(uri,) for uri in uris],
+    )
+    conn.commit()
+
+    assert purge_seeded_sample_data(conn, workspace_dir=workspace_dir).source_rows_deleted == 2
+    assert [row[0] for row in conn.execute("SELECT source_uri FROM sources ORDER BY id")] == uris[2:]
+    plan = " ".join(str(row[3]) for row in conn.execute(f"EXPLAIN QUERY PLAN {_SAMPLE_SOURCE_IDS_SQL}", ("",) * 4))
+    assert "idx_sources_uri" in plan
+
+
+def test_sample_repo_matches_committing_each_plan_step(tmp_path: Path) -> None:
+    # fast-import must yield the same commits as `git add -A && git commit` per plan step.
+    repo_dir = tmp_path / "sample_repo"
+    _materialize_sample_git_repo(repo_dir)
+
+    manual = tmp_path / "manual"
+    manual.mkdir()
+    subprocess.run(["git", "-C", str(manual), "init", "-q"], check=True)
+    for step in _load_commit_plan():
+        for rel_path, content in step["files"].items():
+            (manual / rel_path).parent.mkdir(parents=True, exist_ok=True)
+            (manual / rel_path).write_text(content, encoding="utf-8")
+        subprocess.run(["git", "-C", str(manual), "add", "-A"], check=True)
+        env = {
+            **os.environ,
+            "GIT_AUTHOR_NAME": SAMPLE_AUTHOR_NAME,
+            "GIT_AUTHOR_EMAIL": SAMPLE_AUTHOR_EMAIL,
+            "GIT_COMMITTER_NAME": SAMPLE_AUTHOR_NAME,
+            "GIT_COMMITTER_EMAIL": SAMPLE_AUTHOR_EMAIL,
+            "GIT_AUTHOR_DATE": step["date"],
+            "GIT_COMMITTER_DATE": step["date"],
+        }
+        subprocess.run(["git", "-C", str(manual), "commit", "-q", "-m", step["message"]], check=True, env=env)
+
+    def log(path: Path) -> str:
+        return subprocess.run(
+            ["git", "-C", str(path), "log", "--format=%H"], check=True, capture_output=True, text=True
+        ).stdout
+
+    assert log(repo_dir) == log(manual)
+    # The working tree is checked out too, and clean apart from the seed marker.
+    status = subprocess.run(
+        ["git", "-C", str(repo_dir), "status", "--porcelain"], check=True, capture_output=True, text=True
+    ).stdout
+    assert status == "?? .cmrag_sample_seed_version\n"
+    assert (repo_dir / "src" / "cli_stub.py").exists()
 
 
 def _seed_snapshot(conn) -> tuple[list[tuple], list[tuple], list[tuple]]:
-    sources = conn.execute(
+    cur = conn.cursor()
+    cur.row_factory = None  # plain tuples, not sqlite3.Row
+    sources = cur.execute(
         """
         SELECT source_type, source_uri, source_fingerprint, timestamp, title, metadata_json
         FROM sources
         ORDER BY source_type, source_uri
         """
     ).fetchall()
-    chunks = conn.execute(
+    chunks = cur.execute(
         """
         SELECT s.source_type, s.source_uri, c.chunk_index, c.chunk_text, c.metadata_json
         FROM evidence_chunks c
@@ -152,7 +233,7 @@ def _seed_snapshot(conn) -> tuple[list[tuple], list[tuple], list[tuple]]:
         ORDER BY s.source_type, s.source_uri, c.chunk_index
         """
     ).fetchall()
-    eval_rows = conn.execute(
+    eval_rows = cur.execute(
         """
         SELECT query_text, expected_source_uris
         FROM queries_eval
@@ -160,8 +241,4 @@ def _seed_snapshot(conn) -> tuple[list[tuple], list[tuple], list[tuple]]:
         ORDER BY query_text
         """
     ).fetchall()
-    return (
-        [tuple(row) for row in sources],
-        [tuple(row) for row in chunks],
-        [tuple(row) for row in eval_rows],
-    )
+    return sources, chunks, eval_rows
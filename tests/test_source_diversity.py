@@ -14,7 +14,7 @@ import pytest
 from crossmodalrag.db import connect, init_db
 from crossmodalrag.retrieve.lexical import RetrievalHit
 from crossmodalrag.retrieve.lexical import retrieve as lexical_retrieve
-from crossmodalrag.retrieve.rerank import cap_hits_per_source
+from crossmodalrag.retrieve.rerank import cap_hits_per_source, dedupe_hits, iter_capped_hits
 
 
 def _hit(chunk_id: int, source_id: int, score: float, text: str = "") -> RetrievalHit:
@@ -53,6 +53,19 @@ def test_cap_zero_disables(monkeypatch: pytest.MonkeyPatch) -> None:
     assert cap_hits_per_source(hits) == hits
 
 
+def test_lazy_cap_feeds_dedupe_without_pulling_the_tail() -> None:
+    pulled: list[int] = []
+
+    def hits():
+        for i in range(100):
+            pulled.append(i)
+            yield _hit(i, source_id=i // 3, score=1.0 - i / 100, text=f"distinct text {i}")
+
+    kept = dedupe_hits(iter_capped_hits(hits(), cap=2), max_kept=3)
+    assert [h.chunk_id for h in kept] == [0, 1, 3]
+    assert pulled == [0, 1, 2, 3, 4]  # stops one hit past the third survivor
+
+
 def test_cap_default_comes_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
     hits = [_hit(i, source_id=10, score=1.0 - i / 10) for i in range(5)]
     monkeypatch.setenv("CMRAG_MAX_CHUNKS_PER_SOURCE", "3")
@@ -21,6 +21,8 @@ from crossmodalrag.retrieve.lexical import lexical_overlap_score, title_overlap,
         pytest.param("top_k", ["top_k", "topk"], id="code-identifier"),
         pytest.param("plain words", ["plain", "words"], id="no-underscores-unchanged"),
         pytest.param("_", ["_"], id="bare-underscore-no-empty-variant"),
+        pytest.param("Caf\u00e9 MIX_Up", ["caf", "mix_up", "mixup"], id="non-ascii-splits-words"),
+        pytest.param("5\u212a run", ["5", "run"], id="kelvin-sign-is-not-a-k"),
     ],
 )
 def test_tokenize_emits_squashed_underscore_variants(text: str, expected: list[str]) -> None:
@@ -38,7 +40,7 @@ def test_query_f1_matches_doc_f_underscore_1_symmetrically() -> None:
 
 
 def test_title_overlap_scores_and_caches() -> None:
-    cache: dict[str, list[str]] = {}
+    cache: dict = {}
     q = tokenize("what is the fourier transform?")
     assert title_overlap(q, "Fourier Transform", cache) > 0.5
     assert title_overlap(q, "Unrelated Topic", cache) == 0.0
@@ -9,6 +9,7 @@ from crossmodalrag.usage.store import (
     clear_usage_events,
     list_usage_events,
     record_usage_event,
+    record_usage_events,
     usage_summaries,
 )
 from crossmodalrag.usage.strength import summarize
@@ -39,6 +40,19 @@ def test_record_preserves_event_at_and_default_weight(conn):
     assert event.weight == 3.0  # EVENT_WEIGHTS default
 
 
+def test_bulk_record_matches_single_records(conn):
+    events = [
+        ("chunk", 7, "accepted_answer", "2026-06-01T00:00:00+00:00"),
+        ("node", 3, "open", "2026-06-02T00:00:00+00:00"),
+    ]
+    assert record_usage_events(conn, events) == 2
+    for kind, target_id, event_type, event_at in events:
+        record_usage_event(conn, kind, target_id, event_type, event_at=event_at)
+    rows = [(e.target_kind, e.target_id, e.event_type, e.weight, e.event_at) for e in list_usage_events(conn)]
+    assert rows[:2] == rows[2:]
+    assert record_usage_events(conn, []) == 0
+
+
 def test_explicit_weight_overrides_default(conn):
     record_usage_event(conn, "node", 3, "retrieval_hit", event_at="2026-06-01T00:00:00+00:00", weight=9.0)
     (event,) = list_usage_events(conn)